@@ -5,6 +5,12 @@ Example Python code for testing the pytest generator.
 import requests
 import sqlite3
 from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+
+# Shared session so repeated calls reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=64))
+REQUEST_TIMEOUT = 5
 
 
 def calculate_total(items: List[Dict[str, float]], tax_rate: float = 0.1) -> float:
@@ -19,7 +25,9 @@ def calculate_total(items: List[Dict[str, float]], tax_rate: float = 0.1) -> flo
 def fetch_user_data(user_id: int) -> Optional[Dict[str, str]]:
     """Fetch user data from external API."""
     try:
-        response = requests.get(f"https://api.example.com/users/{user_id}")
+        response = _SESSION.get(
+            f"https://api.example.com/users/{user_id}", timeout=REQUEST_TIMEOUT
+        )
         response.raise_for_status()
         return response.json()
     except requests.RequestException:
@@ -29,27 +37,23 @@ def fetch_user_data(user_id: int) -> Optional[Dict[str, str]]:
 class UserService:
     """Service for managing user data."""
     
+    USER_COLUMNS = ('id', 'name', 'email')
+    GET_USER_SQL = "SELECT id, name, email FROM users WHERE id = ?"
+    
     def __init__(self, db_connection):
         self.db = db_connection
     
     def get_user(self, user_id: int) -> Optional[Dict[str, str]]:
         """Get user from database."""
-        cursor = self.db.cursor()
-        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-        result = cursor.fetchone()
+        result = self.db.execute(self.GET_USER_SQL, (user_id,)).fetchone()
         
         if result:
-            return {
-                'id': result[0],
-                'name': result[1],
-                'email': result[2]
-            }
+            return dict(zip(self.USER_COLUMNS, result))
         return None
     
     def create_user(self, name: str, email: str) -> int:
         """Create a new user."""
-        cursor = self.db.cursor()
-        cursor.execute(
+        cursor = self.db.execute(
             "INSERT INTO users (name, email) VALUES (?, ?)",
             (name, email)
         )
@@ -1,73 +1,118 @@
 """
 A Flask API example for testing the test generator.
+
+The ``__main__`` block starts Flask's development server. To serve
+concurrent traffic, run the app under a production WSGI server instead:
+
+    gunicorn -k gevent -w $(nproc) --worker-connections 1000 example_api:app
+
+Use ``-k sync -w N`` instead of gevent workers for CPU-bound handlers.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
+from flask.json.provider import DefaultJSONProvider
 from typing import Dict, List, Optional
+from collections import defaultdict
+from itertools import islice
+from operator import attrgetter
 import json
+import threading
 import uuid
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster (de)serialization."""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 
 # In-memory storage for demo
 users_db: Dict[str, Dict] = {}
 posts_db: Dict[str, Dict] = {}
+usernames_index: Dict[str, str] = {}
+# Striped locks: mutations of one record don't block unrelated records
+_NSTRIPES = 32
+_stripe_locks = [threading.Lock() for _ in range(_NSTRIPES)]
+_usernames_lock = threading.Lock()
+# Guards adding/removing entries in posts_db and posts_by_author, so listing
+# can take a consistent snapshot. A post's fields are guarded by the stripe
+# lock of its author_id, the same key create_post and delete_user use.
+_posts_lock = threading.Lock()
+
+
+def _lock_for(key: str) -> threading.Lock:
+    """Return the stripe lock guarding the given record key."""
+    return _stripe_locks[hash(key) % _NSTRIPES]
+
+
+# Required fields in declaration order; errors name the first one missing
+_USER_FIELD_ORDER = ('username', 'email', 'name')
+_POST_FIELD_ORDER = ('title', 'content', 'author_id')
+_REQUIRED_USER_FIELDS = frozenset(_USER_FIELD_ORDER)
+_REQUIRED_POST_FIELDS = frozenset(_POST_FIELD_ORDER)
+_EDITABLE_USER_FIELDS = _REQUIRED_USER_FIELDS
+
+# Post IDs per author, kept in insertion (creation) order
+posts_by_author: Dict[str, Dict[str, None]] = defaultdict(dict)
 
 
 class User:
     """User model."""
     
-    def __init__(self, username: str, email: str, name: str):
+    __slots__ = ('id', 'username', 'email', 'name', 'created_at', 'is_active')
+    _fields = attrgetter(*__slots__)
+    
+    def __init__(self, username: str, email: str, name: str, now_iso: Optional[str] = None):
         self.id = str(uuid.uuid4())
         self.username = username
         self.email = email
         self.name = name
-        self.created_at = datetime.now().isoformat()
+        self.created_at = now_iso or datetime.now().isoformat()
         self.is_active = True
     
     def to_dict(self) -> Dict:
         """Convert user to dictionary."""
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'name': self.name,
-            'created_at': self.created_at,
-            'is_active': self.is_active
-        }
+        return dict(zip(self.__slots__, self._fields(self)))
     
     def update(self, **kwargs) -> None:
         """Update user fields."""
         for key, value in kwargs.items():
-            if hasattr(self, key):
+            if key in self.__slots__:
                 setattr(self, key, value)
 
 
 class Post:
     """Post model."""
     
-    def __init__(self, title: str, content: str, author_id: str):
+    __slots__ = ('id', 'title', 'content', 'author_id', 'created_at', 'updated_at', 'likes')
+    _fields = attrgetter(*__slots__)
+    
+    def __init__(self, title: str, content: str, author_id: str, now_iso: Optional[str] = None):
         self.id = str(uuid.uuid4())
         self.title = title
         self.content = content
         self.author_id = author_id
-        self.created_at = datetime.now().isoformat()
+        self.created_at = now_iso or datetime.now().isoformat()
         self.updated_at = self.created_at
         self.likes = 0
     
     def to_dict(self) -> Dict:
         """Convert post to dictionary."""
-        return {
-            'id': self.id,
-            'title': self.title,
-            'content': self.content,
-            'author_id': self.author_id,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at,
-            'likes': self.likes
-        }
+        return dict(zip(self.__slots__, self._fields(self)))
     
     def like(self) -> None:
         """Increment like count."""
@@ -75,39 +120,49 @@ class Post:
         self.updated_at = datetime.now().isoformat()
 
 
+@app.before_request
+def stamp_request_time():
+    """Compute the request timestamp once for all handlers."""
+    g.now_iso = datetime.now().isoformat()
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+    return jsonify({'status': 'healthy', 'timestamp': g.now_iso})
 
 
 @app.route('/api/users', methods=['POST'])
 def create_user():
     """Create a new user."""
-    data = request.get_json()
+    data = request.get_json(cache=True)
     
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    required_fields = ['username', 'email', 'name']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'error': f'Missing required field: {field}'}), 400
-    
-    # Check if username already exists
-    for user_id, user_data in users_db.items():
-        if user_data['username'] == data['username']:
-            return jsonify({'error': 'Username already exists'}), 409
+    missing = _REQUIRED_USER_FIELDS.difference(data)
+    if missing:
+        field = next(f for f in _USER_FIELD_ORDER if f in missing)
+        return jsonify({'error': f'Missing required field: {field}'}), 400
     
     user = User(
         username=data['username'],
         email=data['email'],
-        name=data['name']
+        name=data['name'],
+        now_iso=g.now_iso
     )
     
-    users_db[user.id] = user.to_dict()
+    # Check and claim the username atomically
+    with _usernames_lock:
+        if user.username in usernames_index:
+            return jsonify({'error': 'Username already exists'}), 409
+        usernames_index[user.username] = user.id
+    
+    user_data = user.to_dict()
+    with _lock_for(user.id):
+        users_db[user.id] = user_data
     
-    return jsonify(user.to_dict()), 201
+    return jsonify(user_data), 201
 
 
 @app.route('/api/users/<user_id>', methods=['GET'])
@@ -125,18 +180,32 @@ def update_user(user_id: str):
     if user_id not in users_db:
         return jsonify({'error': 'User not found'}), 404
     
-    data = request.get_json()
+    data = request.get_json(cache=True)
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    # Update user data
-    for key, value in data.items():
-        if key in ['username', 'email', 'name']:
-            users_db[user_id][key] = value
-    
-    users_db[user_id]['updated_at'] = datetime.now().isoformat()
-    
-    return jsonify(users_db[user_id])
+    with _lock_for(user_id):
+        user_data = users_db.get(user_id)
+        if user_data is None:
+            return jsonify({'error': 'User not found'}), 404
+        
+        # Keep the username index in sync
+        new_username = data.get('username')
+        old_username = user_data['username']
+        if new_username is not None and new_username != old_username:
+            with _usernames_lock:
+                if new_username in usernames_index:
+                    return jsonify({'error': 'Username already exists'}), 409
+                usernames_index.pop(old_username, None)
+                usernames_index[new_username] = user_id
+        
+        # Update user data
+        user_data.update({key: value for key, value in data.items()
+                          if key in _EDITABLE_USER_FIELDS})
+        
+        user_data['updated_at'] = g.now_iso
+        
+        return jsonify(user_data)
 
 
 @app.route('/api/users/<user_id>', methods=['DELETE'])
@@ -145,13 +214,18 @@ def delete_user(user_id: str):
     if user_id not in users_db:
         return jsonify({'error': 'User not found'}), 404
     
-    del users_db[user_id]
-    
-    # Also delete user's posts
-    posts_to_delete = [post_id for post_id, post in posts_db.items() 
-                      if post['author_id'] == user_id]
-    for post_id in posts_to_delete:
-        del posts_db[post_id]
+    with _lock_for(user_id):
+        user_data = users_db.pop(user_id, None)
+        if user_data is None:
+            return jsonify({'error': 'User not found'}), 404
+        
+        with _usernames_lock:
+            usernames_index.pop(user_data['username'], None)
+        
+        # Also delete user's posts
+        with _posts_lock:
+            for post_id in posts_by_author.pop(user_id, ()):
+                posts_db.pop(post_id, None)
     
     return jsonify({'message': 'User deleted successfully'}), 200
 
@@ -159,15 +233,15 @@ def delete_user(user_id: str):
 @app.route('/api/posts', methods=['POST'])
 def create_post():
     """Create a new post."""
-    data = request.get_json()
+    data = request.get_json(cache=True)
     
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    required_fields = ['title', 'content', 'author_id']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'error': f'Missing required field: {field}'}), 400
+    missing = _REQUIRED_POST_FIELDS.difference(data)
+    if missing:
+        field = next(f for f in _POST_FIELD_ORDER if f in missing)
+        return jsonify({'error': f'Missing required field: {field}'}), 400
     
     # Check if author exists
     if data['author_id'] not in users_db:
@@ -176,12 +250,19 @@ def create_post():
     post = Post(
         title=data['title'],
         content=data['content'],
-        author_id=data['author_id']
+        author_id=data['author_id'],
+        now_iso=g.now_iso
     )
     
-    posts_db[post.id] = post.to_dict()
+    with _lock_for(post.author_id):
+        if post.author_id not in users_db:
+            return jsonify({'error': 'Author not found'}), 404
+        post_data = post.to_dict()
+        with _posts_lock:
+            posts_db[post.id] = post_data
+            posts_by_author[post.author_id][post.id] = None
     
-    return jsonify(post.to_dict()), 201
+    return jsonify(post_data), 201
 
 
 @app.route('/api/posts/<post_id>', methods=['GET'])
@@ -196,13 +277,18 @@ def get_post(post_id: str):
 @app.route('/api/posts/<post_id>/like', methods=['POST'])
 def like_post(post_id: str):
     """Like a post."""
-    if post_id not in posts_db:
+    post_data = posts_db.get(post_id)
+    if post_data is None:
         return jsonify({'error': 'Post not found'}), 404
     
-    posts_db[post_id]['likes'] += 1
-    posts_db[post_id]['updated_at'] = datetime.now().isoformat()
-    
-    return jsonify(posts_db[post_id])
+    with _lock_for(post_data['author_id']):
+        # The post may have been deleted with its author meanwhile
+        if posts_db.get(post_id) is not post_data:
+            return jsonify({'error': 'Post not found'}), 404
+        post_data['likes'] += 1
+        post_data['updated_at'] = g.now_iso
+        
+        return jsonify(post_data)
 
 
 @app.route('/api/posts', methods=['GET'])
@@ -211,15 +297,16 @@ def get_posts():
     author_id = request.args.get('author_id')
     limit = request.args.get('limit', 10, type=int)
     
-    posts = list(posts_db.values())
-    
-    if author_id:
-        posts = [post for post in posts if post['author_id'] == author_id]
-    
-    # Sort by creation date (newest first)
-    posts.sort(key=lambda x: x['created_at'], reverse=True)
+    # Posts are stored in creation order, so newest first is a reverse walk;
+    # take the page under the lock so concurrent writes can't break the walk
+    with _posts_lock:
+        if author_id:
+            author_posts = posts_by_author.get(author_id, {})
+            posts = [posts_db[post_id] for post_id in islice(reversed(author_posts), max(limit, 0))]
+        else:
+            posts = list(islice(reversed(posts_db.values()), max(limit, 0)))
     
-    return jsonify(posts[:limit])
+    return jsonify(posts)
 
 
 @app.errorhandler(404)
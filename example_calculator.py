@@ -35,7 +35,7 @@ class Calculator:
         """Divide first number by second."""
         if b == 0:
             raise ValueError("Cannot divide by zero")
-        result = float(a / b)
+        result = a / b
         self.history.append(f"{a} / {b} = {result}")
         return round(result, self.precision)
     
@@ -82,17 +82,34 @@ def is_prime(n: int) -> bool:
     """Check if a number is prime."""
     if n < 2:
         return False
-    if n == 2:
+    if n < 4:
         return True
-    if n % 2 == 0:
+    if n % 2 == 0 or n % 3 == 0:
         return False
     
-    for i in range(3, int(math.sqrt(n)) + 1, 2):
-        if n % i == 0:
+    # Only candidates of the form 6k ± 1 can be prime divisors
+    i = 5
+    while i * i <= n:
+        if n % i == 0 or n % (i + 2) == 0:
             return False
+        i += 6
     return True
 
 
+def primes_up_to(limit: int) -> List[int]:
+    """Return all primes <= limit using a Sieve of Eratosthenes."""
+    if limit < 2:
+        return []
+    
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[0] = sieve[1] = 0
+    for i in range(2, math.isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit + 1, i)))
+    
+    return [i for i, flag in enumerate(sieve) if flag]
+
+
 def fibonacci(n: int) -> List[int]:
     """Generate Fibonacci sequence up to n terms."""
     if n < 0:
@@ -105,8 +122,11 @@ def fibonacci(n: int) -> List[int]:
     elif n == 2:
         return [0, 1]
     
-    fib = [0, 1]
+    fib = [0] * n
+    fib[1] = 1
+    a, b = 0, 1
     for i in range(2, n):
-        fib.append(fib[i-1] + fib[i-2])
+        a, b = b, a + b
+        fib[i] = b
     
     return fib
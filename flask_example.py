@@ -1,5 +1,12 @@
 """
 Flask API example for testing the pytest generator.
+
+The ``__main__`` block starts Flask's development server. To serve
+concurrent traffic, run the app under a production WSGI server instead:
+
+    gunicorn -k gevent -w $(nproc) --worker-connections 1000 flask_example:app
+
+Use ``-k sync -w N`` instead of gevent workers for CPU-bound handlers.
 """
 
 from flask import Flask, request, jsonify
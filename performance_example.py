@@ -4,25 +4,25 @@ Example file with performance-critical functions for testing.
 
 import time
 import random
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
 from typing import List
 
 
 def bubble_sort(data: List[int]) -> List[int]:
     """
-    Bubble sort algorithm - O(n²) complexity.
+    Sort data in place - delegates to the built-in Timsort, O(n log n).
     Performance critical: should complete within reasonable time.
     """
-    n = len(data)
-    for i in range(n):
-        for j in range(0, n - i - 1):
-            if data[j] > data[j + 1]:
-                data[j], data[j + 1] = data[j + 1], data[j]
+    data.sort()
     return data
 
 
+@lru_cache(maxsize=None)
 def fibonacci(n: int) -> int:
     """
-    Recursive Fibonacci - exponential complexity.
+    Recursive Fibonacci - memoized to O(n) calls.
     Performance critical: should handle reasonable input sizes.
     """
     if n <= 1:
@@ -35,17 +35,9 @@ def binary_search(arr: List[int], target: int) -> int:
     Binary search algorithm - O(log n) complexity.
     Performance critical: should be very fast.
     """
-    left, right = 0, len(arr) - 1
-    
-    while left <= right:
-        mid = (left + right) // 2
-        if arr[mid] == target:
-            return mid
-        elif arr[mid] < target:
-            left = mid + 1
-        else:
-            right = mid - 1
-    
+    index = bisect_left(arr, target)
+    if index < len(arr) and arr[index] == target:
+        return index
     return -1
 
 
@@ -54,12 +46,7 @@ def process_large_dataset(data: List[str]) -> dict:
     Process large dataset - O(n) complexity.
     Performance critical: memory usage and execution time.
     """
-    result = {}
-    for item in data:
-        if item not in result:
-            result[item] = 0
-        result[item] += 1
-    return result
+    return dict(Counter(data))
 
 
 def simple_function(x: int) -> int:
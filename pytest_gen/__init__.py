@@ -10,8 +10,22 @@ __author__ = "Pytest Generator"
 
 from .generator_core import generate_tests, GeneratorCore
 from .config import DEFAULT_CONFIG, GeneratorConfig
-from .panel_gui import launch_gui
-from .ai_assistant import AIAssistant
+
+# Heavy GUI/AI imports are resolved on first access to keep CLI startup fast
+_LAZY_ATTRIBUTES = {
+    "launch_gui": ".panel_gui",
+    "AIAssistant": ".ai_assistant",
+}
+
+
+def __getattr__(name):
+    """Import GUI and AI entry points lazily."""
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     "generate_tests",
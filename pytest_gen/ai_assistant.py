@@ -21,6 +21,15 @@ class AIAssistant:
         """Ask a question to the AI assistant."""
         return self.core.generate_response(question, context_data)
     
+    def ask_batch(self, questions: List[str],
+                  context_data: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Ask several independent questions at once; results are in question order."""
+        return self.core.generate_responses(questions, context_data)
+    
+    def ask_stream(self, question: str, context_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Ask a question and stream the answer; on success "stream" yields text chunks."""
+        return self.core.stream_response(question, context_data)
+    
     def analyze_code(self, source_path: str, code: Optional[str] = None) -> Dict[str, Any]:
         """Analyze code and provide testing recommendations."""
         return self.core.analyze_source_code(source_path, code)
@@ -37,9 +46,9 @@ class AIAssistant:
         """Get best practices for a testing topic."""
         return self.core.get_best_practices_info(topic, context)
     
-    def count_tokens(self, text: str) -> int:
-        """Count tokens in text."""
-        return self.core.count_tokens(text)
+    def count_tokens(self, text: str, exact: bool = True) -> int:
+        """Count tokens in text; exact=False returns a fast estimate."""
+        return self.core.count_tokens(text, exact)
     
     def get_context_summary(self) -> Dict[str, Any]:
         """Get summary of current context."""
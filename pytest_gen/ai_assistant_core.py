@@ -2,18 +2,33 @@
 Core functionality for AI assistant operations.
 """
 
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Any, Optional
 from .ai_config import AIConfigManager
 from .ai_types import AIProvider
 from .ai_context import AIContext
 from .ai_prompts import PromptTemplates, PromptType
 from .ai_providers import AIProviderFactory
-from .ai_operations import AIOperations
+from .ai_operations import AIOperations, get_token_encoder
+
+# Failure results of the readiness check; callers get a fresh copy each time
+_ERR_DISABLED = MappingProxyType({"success": False, "error": "AI assistant is disabled"})
+_ERR_NO_PROVIDER = MappingProxyType({"success": False, "error": "AI provider not initialized"})
 
 
 class AIAssistantCore:
     """Core functionality for AI assistant."""
     
+    TOKEN_COUNT_CACHE_SIZE = 4096
+    # Total characters of cached texts; a text longer than this is not cached
+    TOKEN_COUNT_CACHE_MAX_CHARS = 4 * 1024 * 1024
+    # Texts shorter than this are not worth remembering as a prefix
+    MIN_PREFIX_LENGTH = 256
+    # Characters per token assumed when capping code; code often packs
+    # fewer than the usual ~4 characters into a token
+    CODE_CHARS_PER_TOKEN = 3
+    
     def __init__(self, config_manager: Optional[AIConfigManager] = None):
         self.config_manager = config_manager or AIConfigManager()
         self.config = self.config_manager.get_config()
@@ -22,6 +37,14 @@ class AIAssistantCore:
         self._token_encoder = None
         self._provider = None
         self._operations = None
+        self._token_count_cache: "OrderedDict[str, int]" = OrderedDict()
+        self._token_count_cache_chars = 0
+        # Last line-aligned prefix counted, for prompts that grow turn by turn
+        self._prefix_text = ""
+        self._prefix_tokens = 0
+        # Prompt tokens available once the response allowance is reserved
+        self._prompt_token_budget = max(self.config.context_window - self.config.max_tokens, 0)
+        self._system_prompt_tokens = 0
         self._initialize_components()
     
     def _initialize_components(self):
@@ -31,18 +54,13 @@ class AIAssistantCore:
     
     def _initialize_token_encoder(self):
         """Initialize token encoder for counting tokens."""
-        try:
-            import tiktoken
-            return tiktoken.get_encoding("cl100k_base")
-        except ImportError:
-            return None
-        except Exception:
-            return None
+        return get_token_encoder()
     
     def initialize_provider(self, api_key: Optional[str] = None) -> Dict[str, Any]:
         """Initialize the AI provider."""
         if api_key:
-            self.config.api_key = api_key
+            self.config_manager.update_config(api_key=api_key)
+            self.config = self.config_manager.get_config()
         
         validation_result = self.config_manager.validate_config()
         
@@ -55,11 +73,10 @@ class AIAssistantCore:
         
         # Initialize provider
         try:
-            self._provider = AIProviderFactory.create_provider(
-                self.config.provider.value, self.config
-            )
+            self._provider = AIProviderFactory.create_provider(self.config.provider.value, self.config)
             # Initialize operations with provider
             self._operations = AIOperations(self.prompts, self._provider, self._token_encoder)
+            self._system_prompt_tokens = self.count_tokens(self.prompts.get_prompt(PromptType.SYSTEM))
         except Exception as e:
             return {
                 "success": False,
@@ -75,23 +92,12 @@ class AIAssistantCore:
     
     def generate_response(self, question: str, context_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate AI response for a question."""
-        if not self.config.enabled:
-            return {
-                "success": False,
-                "error": "AI assistant is disabled"
-            }
-        
-        if not self._provider or not self._operations:
-            return {
-                "success": False,
-                "error": "AI provider not initialized"
-            }
+        unavailable = self._check_ready()
+        if unavailable:
+            return unavailable
         
         try:
-            # Get relevant context
-            relevant_context = self.context.get_relevant_context(question)
-            if context_data:
-                relevant_context.update(context_data)
+            relevant_context = self._prepare_conversation_context(question, context_data)
             
             # Add user message to context
             self.context.add_message("user", question)
@@ -115,6 +121,106 @@ class AIAssistantCore:
                 "error": f"Failed to generate response: {str(e)}"
             }
     
+    def generate_responses(self, questions: List[str],
+                           context_data: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Generate AI responses for independent questions in a single batch.
+        
+        Every question sees the conversation as it was before the batch; the
+        questions and answers are then recorded in order.
+        """
+        unavailable = self._check_ready()
+        if unavailable:
+            return [dict(unavailable) for _ in questions]
+        
+        try:
+            contexts = [self._prepare_conversation_context(q, context_data) for q in questions]
+            responses = self._operations.generate_responses_with_context(questions, contexts)
+        except Exception as e:
+            return [{
+                "success": False,
+                "error": f"Failed to generate response: {str(e)}"
+            } for _ in questions]
+        
+        results = []
+        for question, response in zip(questions, responses):
+            self.context.add_message("user", question)
+            if isinstance(response, Exception):
+                results.append({
+                    "success": False,
+                    "error": f"Failed to generate response: {str(response)}"
+                })
+                continue
+            
+            self.context.add_message("assistant", response["content"])
+            results.append({
+                "success": True,
+                "response": response["content"],
+                "metadata": response.get("metadata", {}),
+                "tokens_used": response.get("tokens_used", 0)
+            })
+        
+        return results
+    
+    def stream_response(self, question: str, context_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Start a streamed AI response; on success "stream" yields text chunks."""
+        unavailable = self._check_ready()
+        if unavailable:
+            return unavailable
+        
+        try:
+            relevant_context = self._prepare_conversation_context(question, context_data)
+            self.context.add_message("user", question)
+            chunks = self._operations.stream_response_with_context(question, relevant_context)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to generate response: {str(e)}"
+            }
+        
+        return {
+            "success": True,
+            "stream": self._record_streamed_response(chunks)
+        }
+    
+    def _record_streamed_response(self, chunks: Iterator[str]) -> Iterator[str]:
+        """Pass chunks through and add the complete response to context."""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self.context.add_message("assistant", "".join(parts))
+    
+    def _check_ready(self) -> Optional[Dict[str, Any]]:
+        """Return a failure result if responses cannot be generated."""
+        if not self.config.enabled:
+            return dict(_ERR_DISABLED)
+        
+        if not self._provider or not self._operations:
+            return dict(_ERR_NO_PROVIDER)
+        
+        return None
+    
+    def _prepare_conversation_context(self, question: str,
+                                      context_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Collect relevant context and fit history into the prompt budget."""
+        relevant_context = self.context.get_relevant_context(question)
+        if context_data:
+            relevant_context.update(context_data)
+        
+        # Fit conversation history into what is left of the prompt budget
+        if not context_data or "conversation_history" not in context_data:
+            history_budget = (
+                self._prompt_token_budget
+                - self._system_prompt_tokens
+                - self.count_tokens(question)
+                - self.count_tokens(str(relevant_context.get("current_code", "")))
+            )
+            relevant_context["conversation_history"] = self.context.format_conversation_history_within(
+                history_budget, self.count_tokens
+            )
+        
+        return relevant_context
+    
     def analyze_source_code(self, source_path: str, code: Optional[str] = None) -> Dict[str, Any]:
         """Analyze source code and provide testing recommendations."""
         if code is None:
@@ -150,7 +256,17 @@ class AIAssistantCore:
     def explain_test_generation(self, test_files: List[str]) -> Dict[str, Any]:
         """Explain what tests will be generated."""
         try:
-            return self._operations.explain_generation_with_prompt(test_files)
+            # Cap the test code at what the prompt budget leaves after the template
+            template_tokens = self.count_tokens(self._operations.build_explanation_prompt(""))
+            code_budget = self._prompt_token_budget - template_tokens
+            if code_budget <= 0:
+                return {
+                    "success": False,
+                    "error": "No room for test code in the context window; "
+                             "lower max_tokens or raise context_window"
+                }
+            max_chars = code_budget * self.CODE_CHARS_PER_TOKEN
+            return self._operations.explain_generation_with_prompt(test_files, max_chars)
         except Exception as e:
             return {
                 "success": False,
@@ -167,9 +283,54 @@ class AIAssistantCore:
                 "error": f"Failed to get best practices: {str(e)}"
             }
     
-    def count_tokens(self, text: str) -> int:
-        """Count tokens in text."""
-        return self._operations.count_tokens_in_text(text)
+    def count_tokens(self, text: str, exact: bool = True) -> int:
+        """Count tokens in text, reusing counts for repeated strings.
+        
+        With exact=False a cheap length-based estimate is returned instead.
+        """
+        if not exact:
+            return self._operations.count_tokens_in_text(text, exact=False)
+        cache = self._token_count_cache
+        count = cache.get(text)
+        if count is not None:
+            cache.move_to_end(text)
+            return count
+        
+        count = self._count_tokens_with_prefix(text)
+        if len(text) > self.TOKEN_COUNT_CACHE_MAX_CHARS:
+            return count
+        cache[text] = count
+        self._token_count_cache_chars += len(text)
+        while (len(cache) > self.TOKEN_COUNT_CACHE_SIZE
+               or self._token_count_cache_chars > self.TOKEN_COUNT_CACHE_MAX_CHARS):
+            evicted, _ = cache.popitem(last=False)
+            self._token_count_cache_chars -= len(evicted)
+        return count
+    
+    def _count_tokens_with_prefix(self, text: str) -> int:
+        """Count tokens, tokenizing only the suffix when text extends the stored prefix.
+        
+        Prefixes end at a newline followed by a non-whitespace character.
+        The tokenizer merges runs of newlines and attaches trailing newlines to
+        punctuation, so only such a split is a pre-tokenization boundary that
+        leaves the count unchanged; the prefix is reused only when the text
+        continues with a non-whitespace character there.
+        """
+        prefix = self._prefix_text
+        if prefix and text.startswith(prefix) and not text[len(prefix):len(prefix) + 1].isspace():
+            count = self._prefix_tokens + self._operations.count_tokens_in_text(text[len(prefix):])
+        else:
+            count = self._operations.count_tokens_in_text(text)
+        
+        # Last newline that is followed by a non-whitespace character
+        newline = text.rfind("\n")
+        while newline != -1 and (newline + 1 == len(text) or text[newline + 1].isspace()):
+            newline = text.rfind("\n", 0, newline)
+        boundary = newline + 1
+        if boundary >= self.MIN_PREFIX_LENGTH and boundary > len(prefix):
+            self._prefix_tokens = count - self._operations.count_tokens_in_text(text[boundary:])
+            self._prefix_text = text[:boundary]
+        return count
     
     def get_context_summary(self) -> Dict[str, Any]:
         """Get summary of current context."""
@@ -2,8 +2,10 @@
 AI chat widget event handlers and message processing.
 """
 
+import threading
 import panel as pn
-from typing import Dict, List, Any, Optional, Callable
+from functools import partial
+from typing import Dict, Iterator, List, Any, Optional, Callable, Tuple
 from .ai_assistant import AIAssistant
 from .ai_widget_components import AIWidgetComponents
 
@@ -11,10 +13,30 @@ from .ai_widget_components import AIWidgetComponents
 class AIChatHandlers:
     """Event handlers for AI chat widget."""
     
+    STATUS_COLORS = {
+        "success": "#28a745",
+        "warning": "#ffc107",
+        "danger": "#dc3545",
+        "info": "#17a2b8"
+    }
+    DEFAULT_STATUS_COLOR = "#6c757d"
+    STATUS_TEMPLATE = "<div style='color: {color};'>{message}</div>"
+    
+    ACTION_MESSAGES = {
+        'analyze_btn': "Please analyze the selected files and suggest test strategies.",
+        'suggest_btn': "What tests should I write for better coverage?",
+        'explain_btn': "Help me understand the test generator configuration options.",
+        'practices_btn': "What are the best practices for writing pytest tests?"
+    }
+    
     def __init__(self, assistant: AIAssistant, widgets: Dict[str, pn.widgets.Widget]):
         self.assistant = assistant
         self.widgets = widgets
         self.conversation_history = []
+        # Rendered HTML per message, parallel to conversation_history
+        self._rendered_messages: List[str] = []
+        # True while a response streams; new messages wait until it finishes
+        self._streaming = False
     
     def setup_callbacks(self):
         """Setup widget callbacks."""
@@ -23,7 +45,7 @@ class AIChatHandlers:
             self._on_send_message, 'clicks'
         )
         
-        # Enter key in input field
+        # Submitted input (the committed value, not per-keystroke value_input)
         self.widgets['message_input'].param.watch(
             self._on_enter_key, 'value'
         )
@@ -34,8 +56,7 @@ class AIChatHandlers:
         )
         
         # Quick action callbacks
-        action_buttons = ['analyze_btn', 'suggest_btn', 'explain_btn', 'practices_btn']
-        for btn_key in action_buttons:
+        for btn_key in self.ACTION_MESSAGES:
             if btn_key in self.widgets:
                 self.widgets[btn_key].param.watch(
                     lambda event, key=btn_key: self._on_quick_action(key), 'clicks'
@@ -44,39 +65,48 @@ class AIChatHandlers:
     def _on_send_message(self, event):
         """Handle send message button click."""
         message = self.widgets['message_input'].value.strip()
-        if message:
-            self._send_message(message)
+        if message and self._send_message(message):
             self.widgets['message_input'].value = ""
     
     def _on_enter_key(self, event):
         """Handle enter key in input field."""
         if event.new and not event.old:  # New message entered
             message = event.new.strip()
-            if message:
-                self._send_message(message)
+            if message and self._send_message(message):
                 self.widgets['message_input'].value = ""
     
     def _on_clear_conversation(self, event):
         """Handle clear conversation button click."""
+        if self._streaming:
+            self._update_status("Wait for the current response to finish", "warning")
+            return
         self.conversation_history = []
+        self._rendered_messages = []
         self.assistant.clear_context()
         self._update_chat_display()
         self._update_status("Conversation cleared", "info")
     
     def _on_quick_action(self, action_key: str):
         """Handle quick action button clicks."""
-        action_messages = {
-            'analyze_btn': "Please analyze the selected files and suggest test strategies.",
-            'suggest_btn': "What tests should I write for better coverage?",
-            'explain_btn': "Help me understand the test generator configuration options.",
-            'practices_btn': "What are the best practices for writing pytest tests?"
-        }
-        
-        message = action_messages.get(action_key, "How can I help you?")
+        message = self.ACTION_MESSAGES.get(action_key, "How can I help you?")
         self._send_message(message)
     
-    def _send_message(self, message: str):
-        """Send a message to the AI assistant."""
+    def _set_inputs_disabled(self, disabled: bool) -> None:
+        """Enable or disable the send and quick action buttons."""
+        for key in ('send_button', *self.ACTION_MESSAGES):
+            if key in self.widgets:
+                self.widgets[key].disabled = disabled
+    
+    def _send_message(self, message: str) -> bool:
+        """Send a message to the AI assistant.
+        
+        Returns False without sending while another response is streaming.
+        """
+        if self._streaming:
+            self._update_status("Wait for the current response to finish", "warning")
+            return False
+        self._streaming = True
+        
         # Add user message to conversation
         self.conversation_history.append({
             "role": "user",
@@ -84,57 +114,84 @@ class AIChatHandlers:
             "timestamp": AIWidgetComponents.get_timestamp()
         })
         
-        # Update chat display
-        self._update_chat_display()
-        
-        # Update status
-        self._update_status("AI is thinking...", "warning")
-        
-        # Disable send button
-        self.widgets['send_button'].disabled = True
+        # Show the pending state in a single document patch
+        with pn.io.hold():
+            self._update_chat_display()
+            self._update_status("AI is thinking...", "warning")
+            self._set_inputs_disabled(True)
         
         try:
-            # Get AI response
-            response = self.assistant.ask(message)
-            
-            if response["success"]:
-                ai_message = {
-                    "role": "assistant",
-                    "content": response["response"],
-                    "timestamp": AIWidgetComponents.get_timestamp(),
-                    "tokens_used": response.get("tokens_used", 0)
-                }
-                self.conversation_history.append(ai_message)
-                
-                self._update_status(
-                    f"Response received ({ai_message['tokens_used']} tokens)",
-                    "success"
-                )
-            else:
-                error_message = {
-                    "role": "assistant",
-                    "content": f"Error: {response['error']}",
-                    "timestamp": AIWidgetComponents.get_timestamp(),
-                    "is_error": True
-                }
-                self.conversation_history.append(error_message)
-                
-                self._update_status(f"Error: {response['error']}", "danger")
-        
+            # Start a streamed AI response
+            response = self.assistant.ask_stream(message)
         except Exception as e:
-            error_message = {
+            response = {"success": False, "error": f"Unexpected error: {str(e)}"}
+        
+        if not response["success"]:
+            self.conversation_history.append({
                 "role": "assistant",
-                "content": f"Unexpected error: {str(e)}",
+                "content": f"Error: {response['error']}",
                 "timestamp": AIWidgetComponents.get_timestamp(),
                 "is_error": True
-            }
-            self.conversation_history.append(error_message)
-            self._update_status(f"Error: {str(e)}", "danger")
+            })
+            self._finish_response((f"Error: {response['error']}", "danger"))
+            return True
         
-        finally:
-            # Re-enable send button
-            self.widgets['send_button'].disabled = False
-            self._update_chat_display()
+        ai_message = {
+            "role": "assistant",
+            "content": "",
+            "timestamp": AIWidgetComponents.get_timestamp()
+        }
+        self.conversation_history.append(ai_message)
+        
+        # Consume the stream off the UI thread when served; inline otherwise
+        doc = pn.state.curdoc
+        if doc is None:
+            self._consume_stream(response["stream"], ai_message, None)
+        else:
+            threading.Thread(
+                target=self._consume_stream,
+                args=(response["stream"], ai_message, doc),
+                daemon=True
+            ).start()
+        return True
+    
+    def _consume_stream(self, stream: Iterator[str], ai_message: Dict[str, Any], doc) -> None:
+        """Append streamed chunks to the assistant message, refreshing the display."""
+        try:
+            for chunk in stream:
+                ai_message["content"] += chunk
+                self._schedule(doc, self._refresh_last_message)
+            # Streams carry no usage data, so count the response tokens here
+            ai_message["tokens_used"] = self.assistant.count_tokens(ai_message["content"])
+            status = (f"Response received ({ai_message['tokens_used']} tokens)", "success")
+        except Exception as e:
+            ai_message["content"] += f"\n\nError: {str(e)}"
+            ai_message["is_error"] = True
+            status = (f"Error: {str(e)}", "danger")
+        
+        self._schedule(doc, partial(self._finish_response, status))
+    
+    @staticmethod
+    def _schedule(doc, callback: Callable[[], None]) -> None:
+        """Run a UI update on the document's next tick, or immediately without one."""
+        if doc is None:
+            callback()
+        else:
+            doc.add_next_tick_callback(callback)
+    
+    def _refresh_last_message(self) -> None:
+        """Re-render the last (still streaming) message."""
+        if len(self._rendered_messages) == len(self.conversation_history):
+            self._rendered_messages.pop()
+        self._update_chat_display()
+    
+    def _finish_response(self, status: Tuple[str, str]) -> None:
+        """Apply the final display, status and button state in a single patch."""
+        with pn.io.hold():
+            self._set_inputs_disabled(False)
+            self._refresh_last_message()
+            self._update_status(*status)
+        self._streaming = False
     
     def _update_chat_display(self):
         """Update the chat display with current conversation."""
@@ -152,42 +209,46 @@ class AIChatHandlers:
         if not self.conversation_history:
             return AIWidgetComponents.format_empty_chat()
         
-        html_parts = [
-            "<div style='font-family: -apple-system, BlinkMacSystemFont, \"Segoe UI\", Roboto, sans-serif;'>"
-        ]
-        
-        for message in self.conversation_history:
-            role = message["role"]
-            content = message["content"]
-            timestamp = message["timestamp"]
-            
-            if role == "user":
-                html_parts.append(AIWidgetComponents.format_user_message(content, timestamp))
-            else:
-                is_error = message.get("is_error", False)
-                tokens_used = message.get("tokens_used", 0)
-                html_parts.append(
-                    AIWidgetComponents.format_assistant_message(content, timestamp, is_error, tokens_used)
-                )
+        # Only messages appended since the last render need formatting
+        rendered = self._rendered_messages
+        for message in self.conversation_history[len(rendered):]:
+            rendered.append(self._render_message(message))
+        
+        return "".join((
+            "<div style='font-family: -apple-system, BlinkMacSystemFont, \"Segoe UI\", Roboto, sans-serif;'>",
+            *rendered,
+            "</div>"
+        ))
+    
+    @staticmethod
+    def _render_message(message: Dict[str, Any]) -> str:
+        """Format a single conversation message as HTML."""
+        content = message["content"]
+        timestamp = message["timestamp"]
+        
+        if message["role"] == "user":
+            return AIWidgetComponents.format_user_message(content, timestamp)
         
-        html_parts.append("</div>")
-        return "".join(html_parts)
+        is_error = message.get("is_error", False)
+        tokens_used = message.get("tokens_used", 0)
+        return AIWidgetComponents.format_assistant_message(content, timestamp, is_error, tokens_used)
     
     def _update_status(self, message: str, status_type: str):
         """Update status indicator."""
-        colors = {
-            "success": "#28a745",
-            "warning": "#ffc107",
-            "danger": "#dc3545",
-            "info": "#17a2b8"
-        }
+        color = self.STATUS_COLORS.get(status_type, self.DEFAULT_STATUS_COLOR)
+        self.widgets['status'].value = self.STATUS_TEMPLATE.format(color=color, message=message)
+    
+    def get_conversation_history(self) -> Tuple[Dict[str, Any], ...]:
+        """Get a read-only snapshot of the conversation history.
         
-        color = colors.get(status_type, "#6c757d")
-        self.widgets['status'].value = f"<div style='color: {color};'>{message}</div>"
+        Message dicts are shared with the widget; use clone_conversation_history
+        for a list that can be modified.
+        """
+        return tuple(self.conversation_history)
     
-    def get_conversation_history(self) -> List[Dict[str, Any]]:
-        """Get current conversation history."""
-        return self.conversation_history.copy()
+    def clone_conversation_history(self) -> List[Dict[str, Any]]:
+        """Get a modifiable copy of the conversation history."""
+        return [dict(message) for message in self.conversation_history]
     
     def add_context_callback(self, callback: Callable[[], Dict[str, Any]]):
         """Add callback to provide context for AI responses."""
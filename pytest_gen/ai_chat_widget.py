@@ -3,7 +3,7 @@ Panel chat widget for AI assistant interface.
 """
 
 import panel as pn
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Tuple
 from .ai_assistant import AIAssistant
 from .ai_config import AIConfigManager
 from .ai_widget_components import AIWidgetComponents
@@ -84,6 +84,10 @@ class AIChatWidget:
         """Set currently selected files for context."""
         self.handlers.set_selected_files(file_paths)
     
-    def get_conversation_history(self) -> List[Dict[str, Any]]:
-        """Get current conversation history."""
-        return self.handlers.get_conversation_history()
\ No newline at end of file
+    def get_conversation_history(self) -> Tuple[Dict[str, Any], ...]:
+        """Get a read-only snapshot of the conversation history."""
+        return self.handlers.get_conversation_history()
+    
+    def clone_conversation_history(self) -> List[Dict[str, Any]]:
+        """Get a modifiable copy of the conversation history."""
+        return self.handlers.clone_conversation_history()
\ No newline at end of file
@@ -5,17 +5,24 @@ Helper functions for AI CLI commands.
 import click
 import sys
 import os
-import glob
-from typing import Dict, Any, Optional
-from .ai_assistant import AIAssistant
+import stat
+from functools import lru_cache
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from .ai_context_models import PREVIEW_LENGTH
+from .ai_file_io import read_text_file
+
+if TYPE_CHECKING:
+    from .ai_assistant import AIAssistant
 
 
 class AICommandHelpers:
     """Helper functions for AI CLI commands."""
     
     @staticmethod
-    def initialize_assistant() -> tuple[AIAssistant, Dict[str, Any]]:
+    def initialize_assistant() -> tuple["AIAssistant", Dict[str, Any]]:
         """Initialize AI assistant and return assistant and result."""
+        from .ai_assistant import AIAssistant
+        
         assistant = AIAssistant()
         init_result = assistant.initialize()
         return assistant, init_result
@@ -31,16 +38,26 @@ class AICommandHelpers:
         return True
     
     @staticmethod
-    def prepare_context(file: Optional[str]) -> Dict[str, Any]:
-        """Prepare context data from file if provided."""
+    def prepare_context(file: Optional[str],
+                        context_cache: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Prepare context data from file if provided, reusing context_cache entries."""
+        if context_cache is not None and file in context_cache:
+            return context_cache[file]
+        
         context = {}
         if file:
             try:
-                with open(file, 'r') as f:
-                    context["file_content"] = f.read()
-                    context["file_path"] = file
+                context["file_content"] = read_text_file(file)
+                context["file_path"] = file
+                if context_cache is not None:
+                    # Interactive sessions embed the file in every prompt through
+                    # current_code, capped like AIContextManager.get_code_block
+                    context["current_code"] = f"```\n{context['file_content'][:PREVIEW_LENGTH]}\n```"
             except Exception as e:
                 click.echo(f"⚠️  Warning: Could not read file {file}: {e}")
+        
+        if context_cache is not None:
+            context_cache[file] = context
         return context
     
     @staticmethod
@@ -60,30 +77,49 @@ class AICommandHelpers:
     @staticmethod
     def find_test_files(directory: str) -> list[str]:
         """Find test files in a directory."""
-        test_files = []
-        if os.path.isdir(directory):
-            test_files = glob.glob(os.path.join(directory, "test_*.py"))
-            test_files.extend(glob.glob(os.path.join(directory, "*_test.py")))
-        elif os.path.isfile(directory):
-            test_files = [directory]
-        return test_files
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return []
+        
+        if stat.S_ISDIR(st.st_mode):
+            # A directory's mtime changes whenever entries are added, removed or renamed
+            return list(AICommandHelpers._scan_test_files(
+                directory, os.path.abspath(directory), st.st_mtime_ns
+            ))
+        if stat.S_ISREG(st.st_mode):
+            return [directory]
+        return []
+    
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _scan_test_files(directory: str, abs_directory: str, mtime_ns: int) -> tuple[str, ...]:
+        """Single directory pass matching test_*.py and *_test.py, memoized per directory mtime."""
+        with os.scandir(directory) as entries:
+            return tuple(
+                entry.path for entry in entries
+                if entry.name.endswith(".py")
+                and (entry.name.startswith("test_")
+                     or (entry.name.endswith("_test.py") and not entry.name.startswith(".")))
+                and entry.is_file()
+            )
     
     @staticmethod
-    def read_file_content(file_path: str) -> str:
-        """Read file content safely."""
+    def read_file_content(file_path: str, st: Optional[os.stat_result] = None) -> str:
+        """Read file content safely, reusing a stat result when given."""
         try:
-            with open(file_path, 'r') as f:
-                return f.read()
+            return read_text_file(file_path, st)
         except Exception as e:
             raise Exception(f"Failed to read file {file_path}: {e}")
     
     @staticmethod
-    def validate_file_exists(file_path: str, file_type: str = "file") -> bool:
-        """Validate that a file exists."""
-        if not os.path.exists(file_path):
+    def validate_file_exists(file_path: str, file_type: str = "file") -> Optional[os.stat_result]:
+        """Validate that a file exists, returning its stat result (truthy) or None."""
+        try:
+            return os.stat(file_path)
+        except OSError:
             click.echo(f"❌ {file_type.title()} not found: {file_path}")
-            return False
-        return True
+            return None
     
     @staticmethod
     def format_verbose_info(init_result: Dict[str, Any], file: Optional[str] = None):
@@ -93,8 +129,23 @@ class AICommandHelpers:
             click.echo(f"📁 Using file context: {file}")
     
     @staticmethod
-    def handle_interactive_mode(assistant: AIAssistant):
-        """Handle interactive mode for AI assistant."""
+    def handle_interactive_mode(assistant: "AIAssistant", file: Optional[str] = None,
+                                context_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+                                batch: bool = False):
+        """Handle interactive mode for AI assistant.
+        
+        The same assistant and file context are reused for every question, so
+        the file is read once and each prompt shares a stable prefix. With
+        batch set, piped questions are answered together instead of in turn.
+        """
+        if context_cache is None:
+            context_cache = {}
+        context = AICommandHelpers.prepare_context(file, context_cache)
+        
+        if batch and not sys.stdin.isatty():
+            AICommandHelpers.handle_piped_questions(assistant, context)
+            return
+        
         click.echo("🤖 AI Testing Assistant")
         click.echo("=" * 30)
         click.echo("Type 'quit' or 'exit' to end the session.")
@@ -111,7 +162,7 @@ class AICommandHelpers:
                 if not question.strip():
                     continue
                 
-                response = assistant.ask(question)
+                response = assistant.ask(question, context)
                 
                 if response["success"]:
                     click.echo(f"\n🤖 AI: {response['response']}\n")
@@ -124,6 +175,30 @@ class AICommandHelpers:
             except Exception as e:
                 click.echo(f"\n❌ Error: {e}\n")
     
+    @staticmethod
+    def handle_piped_questions(assistant: "AIAssistant", context: Optional[Dict[str, Any]] = None):
+        """Answer questions piped on stdin (one per line) in a single batch.
+        
+        The questions are independent: none sees the answers to the others.
+        """
+        questions = []
+        for line in click.get_text_stream('stdin').read().splitlines():
+            question = line.strip()
+            if question.lower() in ['quit', 'exit', 'q']:
+                break
+            if question:
+                questions.append(question)
+        
+        if not questions:
+            return
+        
+        for question, response in zip(questions, assistant.ask_batch(questions, context)):
+            click.echo(f"You: {question}")
+            if response["success"]:
+                click.echo(f"\n🤖 AI: {response['response']}\n")
+            else:
+                click.echo(f"\n❌ Error: {response['error']}\n")
+    
     @staticmethod
     def display_ai_status():
         """Display AI assistant status information."""
@@ -2,16 +2,21 @@
 AI Assistant configuration and settings.
 """
 
-import os
+import sys
 from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, replace
 from .ai_types import AIProvider
 from .ai_config_helpers import AIConfigHelpers
 
+__all__ = ['AIConfig', 'AIConfigManager', 'AIProvider', 'ai_config_manager']
 
-@dataclass
+# dataclass(slots=True) is only available on Python 3.10+
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class AIConfig:
-    """Configuration for AI assistant."""
+    """Configuration for AI assistant (immutable; use dataclasses.replace to change)."""
     enabled: bool = True
     provider: AIProvider = AIProvider.OPENAI
     model: str = "gpt-4"
@@ -25,6 +30,9 @@ class AIConfig:
     base_url: Optional[str] = None  # For local LLMs like Ollama
 
 
+_CONFIG_FIELDS = frozenset(f.name for f in fields(AIConfig))
+
+
 class AIConfigManager:
     """Manages AI configuration loading and validation."""
     
@@ -33,7 +41,9 @@ class AIConfigManager:
     
     def _load_config(self) -> AIConfig:
         """Load AI configuration from environment and defaults."""
-        env_config = AIConfigHelpers.load_config_from_environment()
+        env_config = AIConfigHelpers.load_config_from_environment(
+            AIConfigHelpers.environment_snapshot()
+        )
         
         return AIConfig(
             enabled=env_config['enabled'],
@@ -88,9 +98,9 @@ class AIConfigManager:
     
     def update_config(self, **kwargs) -> None:
         """Update configuration with new values."""
-        for key, value in kwargs.items():
-            if hasattr(self.config, key):
-                setattr(self.config, key, value)
+        updates = {key: value for key, value in kwargs.items() if key in _CONFIG_FIELDS}
+        if updates:
+            self.config = replace(self.config, **updates)
     
     def save_to_file(self, file_path: str) -> None:
         """Save configuration to JSON file."""
@@ -98,8 +108,17 @@ class AIConfigManager:
     
     def load_from_file(self, file_path: str) -> None:
         """Load configuration from JSON file."""
-        AIConfigHelpers.load_config_from_file(self.config, file_path)
+        self.config = AIConfigHelpers.load_config_from_file(self.config, file_path)
+
+
+_ai_config_manager: Optional[AIConfigManager] = None
 
 
-# Global configuration instance
-ai_config_manager = AIConfigManager()
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    """Build the global configuration instance lazily on first access."""
+    global _ai_config_manager
+    if name == "ai_config_manager":
+        if _ai_config_manager is None:
+            _ai_config_manager = AIConfigManager()
+        return _ai_config_manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,10 +2,70 @@
 Helper functions for AI configuration management.
 """
 
+import importlib.util
+import json
 import os
-from typing import Dict, Any
+from dataclasses import asdict, fields, replace
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, FrozenSet, Optional, Tuple
 from .ai_types import AIProvider
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_PROVIDER_BY_NAME = MappingProxyType({provider.value: provider for provider in AIProvider})
+
+_DEFAULT_MODELS = MappingProxyType({
+    AIProvider.OPENAI: "gpt-4",
+    AIProvider.ANTHROPIC: "claude-3-sonnet-20240229",
+    AIProvider.OLLAMA: "llama2"
+})
+
+_API_KEY_ENV_VARS = MappingProxyType({
+    AIProvider.OPENAI: "OPENAI_API_KEY",
+    AIProvider.ANTHROPIC: "ANTHROPIC_API_KEY",
+    AIProvider.OLLAMA: "OLLAMA_API_KEY"  # Usually not needed for local
+})
+
+# Client library (module name, display name) each hosted provider needs
+_PROVIDER_LIBRARIES = MappingProxyType({
+    AIProvider.OPENAI: ("openai", "OpenAI"),
+    AIProvider.ANTHROPIC: ("anthropic", "Anthropic")
+})
+
+# (predicate, error message) pairs checked by validate_config_parameters
+_PARAMETER_RULES = (
+    (lambda config: config.max_tokens > 0, "max_tokens must be positive"),
+    (lambda config: 0.0 <= config.temperature <= 2.0, "temperature must be between 0.0 and 2.0"),
+    (lambda config: config.context_window > 0, "context_window must be positive"),
+)
+
+# Config fields never written to or read from config files
+_UNPERSISTED_FIELDS = frozenset({'api_key', 'base_url'})
+
+# Environment variables read by load_config_from_environment
+_ENV_VARS = (
+    'PYTEST_GEN_AI_ENABLED',
+    'PYTEST_GEN_AI_PROVIDER',
+    'PYTEST_GEN_AI_MODEL',
+    'PYTEST_GEN_AI_MAX_TOKENS',
+    'PYTEST_GEN_AI_TEMPERATURE',
+    'PYTEST_GEN_AI_CONTEXT_WINDOW',
+    'PYTEST_GEN_AI_CONVERSATION_MEMORY',
+    'PYTEST_GEN_AI_TIMEOUT',
+    'PYTEST_GEN_AI_RETRY_ATTEMPTS',
+    'PYTEST_GEN_AI_BASE_URL',
+    'OPENAI_API_KEY',
+    'ANTHROPIC_API_KEY',
+    'OLLAMA_API_KEY',
+)
+
+EnvSnapshot = FrozenSet[Tuple[str, Optional[str]]]
+
 
 class AIConfigHelpers:
     """Helper functions for AI configuration."""
@@ -13,92 +73,84 @@ class AIConfigHelpers:
     @staticmethod
     def get_default_model(provider: AIProvider) -> str:
         """Get default model for provider."""
-        defaults = {
-            AIProvider.OPENAI: "gpt-4",
-            AIProvider.ANTHROPIC: "claude-3-sonnet-20240229",
-            AIProvider.OLLAMA: "llama2"
-        }
-        return defaults.get(provider, "gpt-4")
+        return _DEFAULT_MODELS.get(provider, "gpt-4")
     
     @staticmethod
     def get_api_key_env_var(provider: AIProvider) -> str:
         """Get API key environment variable for provider."""
-        env_vars = {
-            AIProvider.OPENAI: "OPENAI_API_KEY",
-            AIProvider.ANTHROPIC: "ANTHROPIC_API_KEY",
-            AIProvider.OLLAMA: "OLLAMA_API_KEY"  # Usually not needed for local
-        }
-        return env_vars.get(provider, "OPENAI_API_KEY")
+        return _API_KEY_ENV_VARS.get(provider, "OPENAI_API_KEY")
     
     @staticmethod
     def check_provider_availability(provider: AIProvider) -> bool:
         """Check if the configured provider is available."""
-        if provider == AIProvider.OPENAI:
-            try:
-                import openai
-                return True
-            except ImportError:
-                raise Exception("OpenAI library not installed")
-        
-        elif provider == AIProvider.ANTHROPIC:
-            try:
-                import anthropic
-                return True
-            except ImportError:
-                raise Exception("Anthropic library not installed")
-        
-        elif provider == AIProvider.OLLAMA:
+        if provider == AIProvider.OLLAMA:
             # For Ollama, we assume it's running locally
             return True
         
-        else:
+        library = _PROVIDER_LIBRARIES.get(provider)
+        if library is None:
             raise Exception(f"Unknown provider: {provider}")
+        
+        module_name, display_name = library
+        if not AIConfigHelpers._module_available(module_name):
+            raise Exception(f"{display_name} library not installed")
+        return True
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _module_available(module_name: str) -> bool:
+        """Check whether a module can be imported without importing it."""
+        return importlib.util.find_spec(module_name) is not None
     
     @staticmethod
     def validate_config_parameters(config) -> Dict[str, Any]:
         """Validate configuration parameters."""
-        validation_result = {
-            "valid": True,
-            "errors": [],
+        errors = [message for is_valid, message in _PARAMETER_RULES if not is_valid(config)]
+        return {
+            "valid": not errors,
+            "errors": errors,
             "warnings": []
         }
-        
-        # Validate parameters
-        if config.max_tokens <= 0:
-            validation_result["valid"] = False
-            validation_result["errors"].append("max_tokens must be positive")
-        
-        if not 0.0 <= config.temperature <= 2.0:
-            validation_result["valid"] = False
-            validation_result["errors"].append("temperature must be between 0.0 and 2.0")
-        
-        if config.context_window <= 0:
-            validation_result["valid"] = False
-            validation_result["errors"].append("context_window must be positive")
-        
-        return validation_result
     
     @staticmethod
-    def load_config_from_environment():
+    def environment_snapshot() -> EnvSnapshot:
+        """Capture the environment variables that affect AI configuration."""
+        environ = os.environ
+        return frozenset((var, environ.get(var)) for var in _ENV_VARS)
+    
+    @staticmethod
+    def load_config_from_environment(env: Optional[EnvSnapshot] = None) -> Dict[str, Any]:
         """Load AI configuration from environment variables."""
-        enabled = os.getenv('PYTEST_GEN_AI_ENABLED', 'true').lower() == 'true'
+        if env is None:
+            env = AIConfigHelpers.environment_snapshot()
+        # Copy so callers cannot mutate the memoized result
+        return dict(AIConfigHelpers._parse_environment(env))
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _parse_environment(env: EnvSnapshot) -> Dict[str, Any]:
+        """Parse an environment snapshot; memoized on the snapshot itself."""
+        values = dict(env)
+        
+        def getenv(var, default=None):
+            value = values.get(var)
+            return default if value is None else value
+        
+        enabled = getenv('PYTEST_GEN_AI_ENABLED', 'true').lower() == 'true'
         
-        provider_str = os.getenv('PYTEST_GEN_AI_PROVIDER', 'openai').lower()
-        try:
-            provider = AIProvider(provider_str)
-        except ValueError:
-            provider = AIProvider.OPENAI
+        provider_str = getenv('PYTEST_GEN_AI_PROVIDER', 'openai').lower()
+        provider = _PROVIDER_BY_NAME.get(provider_str, AIProvider.OPENAI)
         
-        model = os.getenv('PYTEST_GEN_AI_MODEL', AIConfigHelpers.get_default_model(provider))
-        api_key = os.getenv(AIConfigHelpers.get_api_key_env_var(provider))
+        model = getenv('PYTEST_GEN_AI_MODEL', AIConfigHelpers.get_default_model(provider))
+        api_key = getenv(AIConfigHelpers.get_api_key_env_var(provider))
         
-        max_tokens = int(os.getenv('PYTEST_GEN_AI_MAX_TOKENS', '2000'))
-        temperature = float(os.getenv('PYTEST_GEN_AI_TEMPERATURE', '0.7'))
-        context_window = int(os.getenv('PYTEST_GEN_AI_CONTEXT_WINDOW', '8000'))
-        conversation_memory = int(os.getenv('PYTEST_GEN_AI_CONVERSATION_MEMORY', '10'))
-        timeout = int(os.getenv('PYTEST_GEN_AI_TIMEOUT', '30'))
-        retry_attempts = int(os.getenv('PYTEST_GEN_AI_RETRY_ATTEMPTS', '3'))
-        base_url = os.getenv('PYTEST_GEN_AI_BASE_URL')
+        max_tokens = int(getenv('PYTEST_GEN_AI_MAX_TOKENS', '2000'))
+        temperature = float(getenv('PYTEST_GEN_AI_TEMPERATURE', '0.7'))
+        context_window = int(getenv('PYTEST_GEN_AI_CONTEXT_WINDOW', '8000'))
+        conversation_memory = int(getenv('PYTEST_GEN_AI_CONVERSATION_MEMORY', '10'))
+        timeout = int(getenv('PYTEST_GEN_AI_TIMEOUT', '30'))
+        retry_attempts = int(getenv('PYTEST_GEN_AI_RETRY_ATTEMPTS', '3'))
+        base_url = getenv('PYTEST_GEN_AI_BASE_URL')
         
         return {
             'enabled': enabled,
@@ -114,55 +166,45 @@ class AIConfigHelpers:
             'base_url': base_url
         }
     
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _persisted_fields(config_type) -> FrozenSet[str]:
+        """Names of the config fields stored in config files."""
+        return frozenset(f.name for f in fields(config_type)) - _UNPERSISTED_FIELDS
+    
     @staticmethod
     def save_config_to_file(config, file_path: str) -> None:
         """Save configuration to JSON file."""
-        import json
+        persisted = AIConfigHelpers._persisted_fields(type(config))
+        settings = {key: value for key, value in asdict(config).items() if key in persisted}
+        settings["provider"] = config.provider.value
+        data = {"ai_assistant": settings}
         
-        config_dict = {
-            "ai_assistant": {
-                "enabled": config.enabled,
-                "provider": config.provider.value,
-                "model": config.model,
-                "max_tokens": config.max_tokens,
-                "temperature": config.temperature,
-                "context_window": config.context_window,
-                "conversation_memory": config.conversation_memory,
-                "timeout": config.timeout,
-                "retry_attempts": config.retry_attempts
-            }
-        }
-        
-        with open(file_path, 'w') as f:
-            json.dump(config_dict, f, indent=2)
+        if orjson is not None:
+            Path(file_path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            Path(file_path).write_text(json.dumps(data, indent=2))
     
     @staticmethod
-    def load_config_from_file(config, file_path: str) -> None:
-        """Load configuration from JSON file."""
-        import json
-        
+    def load_config_from_file(config, file_path: str):
+        """Load configuration from JSON file, returning an updated copy of config."""
         if not os.path.exists(file_path):
-            return
+            return config
         
-        with open(file_path, 'r') as f:
-            config_dict = json.load(f)
+        data = Path(file_path).read_bytes()
+        config_dict = orjson.loads(data) if orjson is not None else json.loads(data)
         
         ai_config = config_dict.get("ai_assistant", {})
         
-        if ai_config:
-            config.enabled = ai_config.get("enabled", config.enabled)
-            
-            provider_str = ai_config.get("provider")
-            if provider_str:
-                try:
-                    config.provider = AIProvider(provider_str)
-                except ValueError:
-                    pass
-            
-            config.model = ai_config.get("model", config.model)
-            config.max_tokens = ai_config.get("max_tokens", config.max_tokens)
-            config.temperature = ai_config.get("temperature", config.temperature)
-            config.context_window = ai_config.get("context_window", config.context_window)
-            config.conversation_memory = ai_config.get("conversation_memory", config.conversation_memory)
-            config.timeout = ai_config.get("timeout", config.timeout)
-            config.retry_attempts = ai_config.get("retry_attempts", config.retry_attempts)
+        if not ai_config:
+            return config
+        
+        persisted = AIConfigHelpers._persisted_fields(type(config))
+        updates = {key: value for key, value in ai_config.items() if key in persisted}
+        
+        provider_str = updates.pop("provider", None)
+        provider = _PROVIDER_BY_NAME.get(provider_str) if isinstance(provider_str, str) else None
+        if provider is not None:
+            updates["provider"] = provider
+        
+        return replace(config, **updates)
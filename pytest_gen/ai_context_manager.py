@@ -2,19 +2,40 @@
 Core context management for AI conversations and code analysis.
 """
 
-from typing import Dict, List, Any, Optional
+from collections import defaultdict, deque
+from itertools import islice
+from types import MappingProxyType
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Any, Mapping, Optional, Set, Tuple
 from .ai_context_models import Message, CodeContext
 
 
 class AIContextManager:
     """Core context management for AI conversations and code analysis."""
     
+    # Greetings and thanks from the user; the turn they start is not worth
+    # spending prompt tokens on
+    LOW_INFORMATION_MESSAGES = frozenset({
+        "hi", "hello", "hey", "thanks", "thank you"
+    })
+    
     def __init__(self, max_conversation_memory: int = 10):
         self.max_conversation_memory = max_conversation_memory
-        self.conversation_history: List[Message] = []
+        # Bounded history: appending past the cap evicts the oldest message in O(1)
+        self.conversation_history: Deque[Message] = deque(maxlen=max_conversation_memory)
         self.code_contexts: Dict[str, CodeContext] = {}
+        # Secondary indexes: lowercased framework / code_type -> {file_path: context}
+        self._by_framework: Dict[str, Dict[str, CodeContext]] = defaultdict(dict)
+        self._by_type: Dict[str, Dict[str, CodeContext]] = defaultdict(dict)
         self.current_context: Optional[str] = None
         self.user_preferences: Dict[str, Any] = {}
+        # Formatted recent history; None when it must be rebuilt
+        self._formatted_history: Optional[str] = None
+        # Optional append-only JSONL log (see AIContextPersistence.attach_conversation_log)
+        self.conversation_log = None
+        # Prompt-ready code blocks keyed by file path, tagged with the content hash
+        self._code_blocks: Dict[str, Tuple[int, str]] = {}
+        # Code contexts added or replaced since the last successful save_context
+        self._dirty_code_contexts: Set[str] = set()
     
     def add_message(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Add a message to the conversation history."""
@@ -24,10 +45,12 @@ class AIContextManager:
             metadata=metadata or {}
         )
         self.conversation_history.append(message)
+        self._formatted_history = None
         
-        # Trim history if it exceeds max memory
-        if len(self.conversation_history) > self.max_conversation_memory:
-            self.conversation_history = self.conversation_history[-self.max_conversation_memory:]
+        if self.conversation_log is not None:
+            self.conversation_log.append(message)
+            if self.conversation_log.needs_compaction():
+                self.conversation_log.compact(self.conversation_history)
     
     def add_code_context(self, file_path: str, content: str, 
                         analysis_result: Optional[Dict[str, Any]] = None,
@@ -43,13 +66,85 @@ class AIContextManager:
             framework=framework,
             code_type=code_type
         )
+        previous = self.code_contexts.get(file_path)
+        if previous is not None:
+            self._unindex(previous)
         self.code_contexts[file_path] = context
+        self._dirty_code_contexts.add(file_path)
+        self._index(context)
+        self.get_code_block(file_path)
+    
+    def replace_code_contexts(self, contexts: Iterable[CodeContext]) -> None:
+        """Replace all code contexts, keyed by their file paths."""
+        self.code_contexts = {ctx.file_path: ctx for ctx in contexts}
+        self._dirty_code_contexts = set(self.code_contexts)
+        self._code_blocks.clear()
+        self._by_framework.clear()
+        self._by_type.clear()
+        for ctx in self.code_contexts.values():
+            self._index(ctx)
+    
+    def _index(self, ctx: CodeContext) -> None:
+        """Add a code context to the framework/code_type indexes."""
+        if ctx._framework_lower:
+            self._by_framework[ctx._framework_lower][ctx.file_path] = ctx
+        if ctx._code_type_lower:
+            self._by_type[ctx._code_type_lower][ctx.file_path] = ctx
+    
+    def _unindex(self, ctx: CodeContext) -> None:
+        """Remove a code context from the framework/code_type indexes."""
+        for index, label in ((self._by_framework, ctx._framework_lower),
+                             (self._by_type, ctx._code_type_lower)):
+            if label and label in index:
+                bucket = index[label]
+                bucket.pop(ctx.file_path, None)
+                if not bucket:
+                    del index[label]
+    
+    @staticmethod
+    def _lookup_index(index: Dict[str, Dict[str, CodeContext]], label: str) -> List[CodeContext]:
+        """Get code contexts whose indexed label matches, case-insensitively."""
+        bucket = index.get(label.lower())
+        return list(bucket.values()) if bucket else []
+    
+    def get_code_block(self, file_path: str) -> str:
+        """Get the prompt-ready code block for a file, rebuilt only when its content changes."""
+        code_ctx = self.code_contexts.get(file_path)
+        if code_ctx is None:
+            return ""
+        
+        content_hash = hash(code_ctx.content)
+        cached = self._code_blocks.get(file_path)
+        if cached is not None and cached[0] == content_hash:
+            return cached[1]
+        
+        block = f"```\n{code_ctx.content_preview()}\n```"
+        self._code_blocks[file_path] = (content_hash, block)
+        return block
+    
+    def replace_conversation_history(self, messages: Iterable[Message]) -> None:
+        """Replace the conversation history, keeping only the most recent messages."""
+        self.conversation_history.clear()
+        self.conversation_history.extend(messages)
+        self._formatted_history = None
+    
+    def _recent_messages(self, count: int) -> Iterator[Message]:
+        """Iterate over the last ``count`` messages, oldest first."""
+        history = self.conversation_history
+        return islice(history, max(len(history) - count, 0), None)
     
-    def get_conversation_history(self, limit: Optional[int] = None) -> List[Message]:
-        """Get conversation history with optional limit."""
+    def get_conversation_history(self, limit: Optional[int] = None) -> Tuple[Message, ...]:
+        """Get a read-only view of the conversation history with optional limit.
+        
+        Use get_conversation_snapshot for a list that can be modified.
+        """
         if limit:
-            return self.conversation_history[-limit:]
-        return self.conversation_history.copy()
+            return tuple(self._recent_messages(limit))
+        return tuple(self.conversation_history)
+    
+    def get_conversation_snapshot(self) -> List[Message]:
+        """Get a mutable copy of the conversation history."""
+        return list(self.conversation_history)
     
     def get_relevant_context(self, query: str) -> Dict[str, Any]:
         """Get context relevant to the query."""
@@ -64,16 +159,24 @@ class AIContextManager:
             current = self.code_contexts[self.current_context]
             context['current_code_context'] = {
                 'file_path': current.file_path,
-                'content': current.content[:1000],  # Limit content length
+                'content': current.content_preview(),  # Limit content length
                 'framework': current.framework,
                 'code_type': current.code_type
             }
+            context['current_code'] = self.get_code_block(self.current_context)
         
-        # Add related contexts based on query keywords
+        # Add related contexts based on query keywords; the label vocabulary is
+        # small, so skip the per-file scan when no label occurs in the query
+        if not self._by_framework and not self._by_type:
+            return context
         query_lower = query.lower()
+        frameworks = {label for label in self._by_framework if label in query_lower}
+        code_types = {label for label in self._by_type if label in query_lower}
+        if not frameworks and not code_types:
+            return context
+        
         for file_path, code_ctx in self.code_contexts.items():
-            if (code_ctx.framework and code_ctx.framework.lower() in query_lower) or \
-               (code_ctx.code_type and code_ctx.code_type.lower() in query_lower):
+            if code_ctx._framework_lower in frameworks or code_ctx._code_type_lower in code_types:
                 context['related_code_contexts'].append({
                     'file_path': file_path,
                     'framework': code_ctx.framework,
@@ -83,23 +186,82 @@ class AIContextManager:
         return context
     
     def _format_conversation_history(self) -> str:
-        """Format conversation history for context."""
+        """Format conversation history for context, reusing it until the history changes."""
+        if self._formatted_history is not None:
+            return self._formatted_history
+        
+        if not self.conversation_history:
+            formatted = "No previous conversation."
+        else:
+            formatted = "\n".join(
+                f"{msg.role}: {msg.content}"
+                for msg in self._recent_messages(5)  # Last 5 messages
+            )
+        
+        self._formatted_history = formatted
+        return formatted
+    
+    def format_conversation_history_within(self, token_budget: int,
+                                           count_tokens: Callable[[str], int]) -> str:
+        """Format the most recent conversation turns that fit within a token budget.
+        
+        Turns are selected newest-first. A greeting or thanks from the user is
+        skipped together with the assistant reply that answers it.
+        """
         if not self.conversation_history:
             return "No previous conversation."
         
-        formatted = []
-        for msg in self.conversation_history[-5:]:  # Last 5 messages
-            formatted.append(f"{msg.role}: {msg.content}")
+        selected = []
+        remaining = token_budget
+        for msg in reversed(self._informative_messages(5)):  # Last 5 messages
+            line = f"{msg.role}: {msg.content}"
+            cost = count_tokens(line)
+            if cost > remaining:
+                break
+            selected.append(line)
+            remaining -= cost
+        
+        if not selected:
+            return "No previous conversation."
+        
+        selected.reverse()
+        return "\n".join(selected)
+    
+    def _informative_messages(self, count: int) -> List[Message]:
+        """Get the last ``count`` messages without low-information turns, oldest first.
         
-        return "\n".join(formatted)
+        A low-information user message is dropped together with the assistant
+        reply to it, even when only the reply is among the last ``count``.
+        """
+        start = len(self.conversation_history) - count
+        kept = []
+        skip_reply = False
+        for index, msg in enumerate(self._recent_messages(count + 1), start=max(start - 1, 0)):
+            if msg.role == "user":
+                skip_reply = msg.content.strip().lower().rstrip("!.") in self.LOW_INFORMATION_MESSAGES
+                if skip_reply:
+                    continue
+            elif skip_reply:
+                skip_reply = False
+                continue
+            if index >= start:
+                kept.append(msg)
+        return kept
     
     def clear_conversation(self) -> None:
         """Clear conversation history."""
         self.conversation_history.clear()
+        self._formatted_history = None
+        if self.conversation_log is not None:
+            self.conversation_log.compact([])
     
     def clear_code_contexts(self) -> None:
         """Clear all code contexts."""
         self.code_contexts.clear()
+        self._dirty_code_contexts.clear()
+        self._code_blocks.clear()
+        self._by_framework.clear()
+        self._by_type.clear()
     
     def clear_all_context(self) -> None:
         """Clear all context."""
@@ -121,6 +283,6 @@ class AIContextManager:
         """Update user preferences."""
         self.user_preferences.update(preferences)
     
-    def get_user_preferences(self) -> Dict[str, Any]:
-        """Get user preferences."""
-        return self.user_preferences.copy()
+    def get_user_preferences(self) -> Mapping[str, Any]:
+        """Get a read-only view of user preferences (copy with dict() to modify)."""
+        return MappingProxyType(self.user_preferences)
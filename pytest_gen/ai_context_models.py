@@ -2,21 +2,40 @@
 Data models for AI context management.
 """
 
+import sys
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 
+# dataclass(slots=True) is only available on Python 3.10+
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+# Maximum characters of a code context included in prompt context
+PREVIEW_LENGTH = 1000
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Message:
     """Represents a message in the conversation."""
     role: str  # 'user', 'assistant', 'system'
     content: str
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Lowercased content for searches, computed on first use
+    _content_lower: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Roles come from a tiny vocabulary; share one string object per role
+        self.role = sys.intern(self.role)
+    
+    def content_lower(self) -> str:
+        """Get the lowercased content, computing it only once."""
+        if self._content_lower is None:
+            self._content_lower = self.content.lower()
+        return self._content_lower
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class CodeContext:
     """Represents code context for analysis."""
     file_path: str
@@ -26,3 +45,39 @@ class CodeContext:
     framework: Optional[str] = None
     code_type: Optional[str] = None
     timestamp: datetime = field(default_factory=datetime.now)
+    # Lowercased framework/code_type for case-insensitive matching
+    _framework_lower: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _code_type_lower: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    # Truncated content for prompts, computed on first use
+    _preview: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # framework/code_type labels repeat across contexts, so intern them
+        if self.framework:
+            self.framework = sys.intern(self.framework)
+            self._framework_lower = sys.intern(self.framework.lower())
+        if self.code_type:
+            self.code_type = sys.intern(self.code_type)
+            self._code_type_lower = sys.intern(self.code_type.lower())
+    
+    def content_preview(self) -> str:
+        """Get the first PREVIEW_LENGTH characters of the content, slicing only once."""
+        if self._preview is None:
+            content = self.content
+            self._preview = content if len(content) <= PREVIEW_LENGTH else content[:PREVIEW_LENGTH]
+        return self._preview
+    
+    @classmethod
+    def _from_dict(cls, data: Dict[str, Any]) -> 'CodeContext':
+        """Build a context from decoded field values, bypassing the generated __init__."""
+        ctx = cls.__new__(cls)
+        ctx.file_path = data['file_path']
+        ctx.content = data['content']
+        ctx.analysis_result = data.get('analysis_result')
+        ctx.dependencies = data.get('dependencies') or []
+        ctx.framework = data.get('framework')
+        ctx.code_type = data.get('code_type')
+        ctx.timestamp = data.get('timestamp') or datetime.now()
+        ctx._framework_lower = ctx._code_type_lower = ctx._preview = None
+        ctx.__post_init__()
+        return ctx
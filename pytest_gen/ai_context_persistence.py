@@ -2,94 +2,441 @@
 Persistence and search methods for AI context.
 """
 
+import hashlib
 import json
+import mmap
 import os
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import pickle
+import struct
+from collections import deque
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List, Any, Optional
+from datetime import datetime, timedelta
 from .ai_context_models import Message, CodeContext
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Binary checkpoint layout: magic, header (payload length, buffer count),
+# buffer lengths, pickled payload, then the raw UTF-8 code buffers
+CHECKPOINT_MAGIC = b"PGAICTX1"
+_CHECKPOINT_HEADER = struct.Struct("<QI")
+_CODE_CONTEXT_FIELDS = tuple(f.name for f in fields(CodeContext) if f.init)
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode datetimes for stdlib json the way orjson does."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dump_json_compact(data: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_json_default).encode('utf-8')
+
+
+def _load_json(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Timestamps are persisted as integer microseconds since this epoch, on the
+# same naive local clock as datetime.now(), so the round trip is exact
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _timestamp_to_int(value: datetime) -> int:
+    """Encode a naive datetime as integer microseconds since the epoch."""
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _timestamp_from_json(value: Any) -> datetime:
+    """Decode a persisted timestamp (integer microseconds, or ISO string from older files)."""
+    if isinstance(value, int):
+        return _EPOCH + timedelta(microseconds=value)
+    if value is None:
+        return datetime.now()
+    return datetime.fromisoformat(value)
+
+
+def _blob_dir(file_path: str) -> str:
+    """Directory holding code content blobs for a saved context file.
+    
+    Each context file has its own directory, so blobs it no longer
+    references can be deleted without affecting other context files.
+    """
+    return f"{os.path.abspath(file_path)}.blobs"
+
+
+def _write_blob(blob_dir: str, content: str) -> str:
+    """Store content under its hash, writing only if not already present."""
+    data = content.encode('utf-8')
+    content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+    blob_path = os.path.join(blob_dir, f"{content_hash}.txt")
+    if not os.path.exists(blob_path):
+        tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, blob_path)
+    return content_hash
+
+
+def _read_blob(blob_dir: str, content_hash: str) -> str:
+    """Read content stored by _write_blob."""
+    with open(os.path.join(blob_dir, f"{content_hash}.txt"), 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+def _prune_blobs(blob_dir: str, content_hashes: Iterable[str]) -> None:
+    """Delete blobs (and leftover temp files) that the manifest no longer references."""
+    keep = {f"{content_hash}.txt" for content_hash in content_hashes}
+    try:
+        entries = os.scandir(blob_dir)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.name not in keep:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+def _dump_json_line(data: Any) -> bytes:
+    """Serialize to a single newline-terminated compact JSON line."""
+    return _dump_json_compact(data) + b'\n'
+
+
+def _code_context_from_json(file_path: str, data: Dict[str, Any], blob_dir: str) -> CodeContext:
+    """Decode a persisted code context entry in place and build the context."""
+    data.setdefault('file_path', file_path)
+    if 'content' not in data:
+        # Newer files store the content as a blob referenced by hash
+        data['content'] = _read_blob(blob_dir, data.get('content_hash', ''))
+    data['timestamp'] = _timestamp_from_json(data.get('timestamp'))
+    return CodeContext._from_dict(data)
+
+
+class ConversationLog:
+    """Append-only JSONL log of conversation messages.
+    
+    Each message is appended as one line, so recording a turn costs O(1)
+    instead of rewriting the whole history. The file is compacted to the
+    last ``max_messages`` entries once it grows past ``compact_factor``
+    times that cap.
+    """
+    
+    def __init__(self, file_path: str, max_messages: int, compact_factor: int = 4):
+        self.file_path = file_path
+        self.max_messages = max_messages
+        self.compact_factor = compact_factor
+        self._lines = sum(1 for _ in self._read_lines())
+        self._file = open(file_path, 'ab')
+    
+    def _read_lines(self) -> Iterator[bytes]:
+        """Yield the non-empty lines of the log file."""
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield line
+    
+    def read_messages(self) -> List[Message]:
+        """Stream the most recent ``max_messages`` messages from the log."""
+        recent = deque(self._read_lines(), maxlen=self.max_messages)
+        messages = []
+        for line in recent:
+            data = _load_json(line)
+            messages.append(Message(
+                role=data['role'],
+                content=data['content'],
+                timestamp=_timestamp_from_json(data['timestamp']),
+                metadata=data.get('metadata', {})
+            ))
+        return messages
+    
+    @staticmethod
+    def _record(message: Message) -> Dict[str, Any]:
+        """JSON-ready form of a message."""
+        return {
+            'role': message.role,
+            'content': message.content,
+            'timestamp': _timestamp_to_int(message.timestamp),
+            'metadata': message.metadata
+        }
+    
+    def append(self, message: Message) -> None:
+        """Append one message; call flush() to force it to disk."""
+        self._file.write(_dump_json_line(self._record(message)))
+        self._lines += 1
+    
+    def needs_compaction(self) -> bool:
+        """Whether the log has grown past its compaction threshold."""
+        return self._lines > self.max_messages * self.compact_factor
+    
+    def compact(self, messages: List[Message]) -> None:
+        """Rewrite the log to hold only the given messages."""
+        self._file.close()
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for message in messages:
+                f.write(_dump_json_line(self._record(message)))
+        os.replace(tmp_path, self.file_path)
+        self._lines = len(messages)
+        self._file = open(self.file_path, 'ab')
+    
+    def flush(self) -> None:
+        """Flush buffered appends to disk."""
+        self._file.flush()
+    
+    def close(self) -> None:
+        """Flush and close the log file."""
+        if not self._file.closed:
+            self._file.close()
+
 
 class AIContextPersistence:
     """Persistence and search methods for AI context."""
     
     def __init__(self, context_manager):
         self.context_manager = context_manager
+        # Blob hashes from the last successful save_context, to skip rehashing
+        # code contexts that have not changed since
+        self._saved_blob_dir: Optional[str] = None
+        self._saved_hashes: Dict[str, str] = {}
     
     def save_context(self, file_path: str) -> None:
-        """Save context to file."""
-        context_data = {
-            'conversation_history': [
-                {
-                    'role': msg.role,
-                    'content': msg.content,
-                    'timestamp': msg.timestamp.isoformat(),
-                    'metadata': msg.metadata
-                }
-                for msg in self.context_manager.conversation_history
-            ],
-            'code_contexts': {
-                path: {
-                    'file_path': ctx.file_path,
-                    'content': ctx.content,
-                    'analysis_result': ctx.analysis_result,
-                    'dependencies': ctx.dependencies,
-                    'framework': ctx.framework,
-                    'code_type': ctx.code_type,
-                    'timestamp': ctx.timestamp.isoformat()
-                }
-                for path, ctx in self.context_manager.code_contexts.items()
-            },
-            'current_context': self.context_manager.current_context,
-            'user_preferences': self.context_manager.user_preferences,
-            'saved_at': datetime.now().isoformat()
-        }
+        """Save context to file.
         
+        Code contents are stored once per distinct content in a
+        ``<file>.blobs`` directory; the JSON manifest keeps only their hashes,
+        and blobs it no longer references are deleted after each save.
+        Entries are encoded and written one at a time, so no intermediate copy
+        of the whole context is built. Code contexts unchanged since the last
+        save to the same location reuse their stored hash instead of being
+        hashed and checked against the blob store again.
+        """
+        tmp_path = f"{file_path}.tmp"
         try:
-            with open(file_path, 'w') as f:
-                json.dump(context_data, f, indent=2)
+            # Bind the hot lookups once; the loops below run per entry
+            manager = self.context_manager
+            code_contexts = manager.code_contexts
+            dump = _dump_json_compact
+            to_int = _timestamp_to_int
+            
+            blob_dir = _blob_dir(file_path)
+            if code_contexts:
+                os.makedirs(blob_dir, exist_ok=True)
+            dirty = manager._dirty_code_contexts
+            previous_hashes = self._saved_hashes if blob_dir == self._saved_blob_dir else {}
+            hashes: Dict[str, str] = {}
+            
+            with open(tmp_path, 'wb') as f:
+                write = f.write
+                write(b'{"conversation_history":[')
+                separator = b'\n'
+                for msg in manager.conversation_history:
+                    write(separator)
+                    write(dump({
+                        'role': msg.role,
+                        'content': msg.content,
+                        'timestamp': to_int(msg.timestamp),
+                        'metadata': msg.metadata
+                    }))
+                    separator = b',\n'
+                
+                write(b'\n],"code_contexts":{')
+                separator = b'\n'
+                for path, ctx in code_contexts.items():
+                    content_hash = None if path in dirty else previous_hashes.get(path)
+                    if content_hash is None:
+                        content_hash = _write_blob(blob_dir, ctx.content)
+                    hashes[path] = content_hash
+                    write(separator)
+                    write(dump(path))
+                    write(b':')
+                    write(dump({
+                        'file_path': ctx.file_path,
+                        'content_hash': content_hash,
+                        'analysis_result': ctx.analysis_result,
+                        'dependencies': ctx.dependencies,
+                        'framework': ctx.framework,
+                        'code_type': ctx.code_type,
+                        'timestamp': to_int(ctx.timestamp)
+                    }))
+                    separator = b',\n'
+                
+                write(b'\n},"current_context":')
+                write(dump(manager.current_context))
+                write(b',\n"user_preferences":')
+                write(dump(manager.user_preferences))
+                write(b',\n"saved_at":')
+                write(dump(datetime.now()))
+                write(b'}\n')
+            os.replace(tmp_path, file_path)
         except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             raise RuntimeError(f"Failed to save context: {e}")
+        
+        dirty.clear()
+        self._saved_blob_dir = blob_dir
+        self._saved_hashes = hashes
+        _prune_blobs(blob_dir, hashes.values())
     
     def load_context(self, file_path: str) -> None:
-        """Load context from file."""
+        """Load context from file.
+        
+        The file is parsed and validated before anything is replaced, so a
+        failed load leaves the current context untouched.
+        """
         if not os.path.exists(file_path):
             return
         
         try:
-            with open(file_path, 'r') as f:
-                context_data = json.load(f)
+            with open(file_path, 'rb') as f:
+                context_data = _load_json(f.read())
+            
+            if not isinstance(context_data, dict):
+                raise ValueError("expected a JSON object")
+            history = context_data.get('conversation_history', [])
+            code_contexts = context_data.get('code_contexts', {})
+            if not isinstance(history, list) or not isinstance(code_contexts, dict):
+                raise ValueError("unexpected conversation_history/code_contexts structure")
             
-            # Load conversation history
-            self.context_manager.conversation_history = [
+            blob_dir = _blob_dir(file_path)
+            messages = [
                 Message(
-                    role=msg['role'],
-                    content=msg['content'],
-                    timestamp=datetime.fromisoformat(msg['timestamp']),
-                    metadata=msg.get('metadata', {})
+                    role=msg.get('role', 'user'),
+                    content=msg.get('content', ''),
+                    timestamp=_timestamp_from_json(msg.get('timestamp')),
+                    metadata=msg.get('metadata') or {}
                 )
-                for msg in context_data.get('conversation_history', [])
+                for msg in history
             ]
-            
-            # Load code contexts
-            self.context_manager.code_contexts = {
-                path: CodeContext(
-                    file_path=ctx['file_path'],
-                    content=ctx['content'],
-                    analysis_result=ctx.get('analysis_result'),
-                    dependencies=ctx.get('dependencies', []),
-                    framework=ctx.get('framework'),
-                    code_type=ctx.get('code_type'),
-                    timestamp=datetime.fromisoformat(ctx['timestamp'])
-                )
-                for path, ctx in context_data.get('code_contexts', {}).items()
-            }
-            
-            # Load other data
-            self.context_manager.current_context = context_data.get('current_context')
-            self.context_manager.user_preferences = context_data.get('user_preferences', {})
-            
-        except Exception as e:
+            contexts = [
+                _code_context_from_json(path, ctx, blob_dir)
+                for path, ctx in code_contexts.items()
+            ]
+        except (OSError, ValueError, TypeError, AttributeError, KeyError) as e:
+            # Unreadable, undecodable or malformed entries all mean a bad file
             raise RuntimeError(f"Failed to load context: {e}")
+        
+        self.context_manager.replace_conversation_history(messages)
+        self.context_manager.replace_code_contexts(contexts)
+        self.context_manager.current_context = context_data.get('current_context')
+        self.context_manager.user_preferences = context_data.get('user_preferences') or {}
+    
+    def save_checkpoint(self, file_path: str) -> None:
+        """Save context as a binary checkpoint for fast local restore.
+        
+        Uses pickle protocol 5 with code contents written as out-of-band
+        buffers, which suits autosaving between turns. The file is replaced
+        atomically, so an interrupted autosave keeps the previous checkpoint.
+        Only load checkpoints from trusted sources.
+        """
+        buffers: List[pickle.PickleBuffer] = []
+        code_contexts = []
+        for ctx in self.context_manager.code_contexts.values():
+            state = {name: getattr(ctx, name) for name in _CODE_CONTEXT_FIELDS}
+            state['content'] = pickle.PickleBuffer(ctx.content.encode('utf-8'))
+            code_contexts.append(state)
+        
+        state = {
+            'conversation_history': list(self.context_manager.conversation_history),
+            'code_contexts': code_contexts,
+            'current_context': self.context_manager.current_context,
+            'user_preferences': self.context_manager.user_preferences,
+            'saved_at': datetime.now()
+        }
+        
+        tmp_path = f"{file_path}.tmp"
+        try:
+            payload = pickle.dumps(state, protocol=5, buffer_callback=buffers.append)
+            raw_buffers = [buf.raw() for buf in buffers]
+            with open(tmp_path, 'wb') as f:
+                f.write(CHECKPOINT_MAGIC)
+                f.write(_CHECKPOINT_HEADER.pack(len(payload), len(raw_buffers)))
+                f.write(struct.pack(f"<{len(raw_buffers)}Q", *(buf.nbytes for buf in raw_buffers)))
+                f.write(payload)
+                for buf in raw_buffers:
+                    f.write(buf)
+            os.replace(tmp_path, file_path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise RuntimeError(f"Failed to save checkpoint: {e}")
+    
+    def load_checkpoint(self, file_path: str) -> None:
+        """Load context from a binary checkpoint written by save_checkpoint."""
+        if not os.path.exists(file_path):
+            return
+        
+        try:
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    state = self._decode_checkpoint(view)
+                finally:
+                    view.release()
+        except Exception as e:
+            raise RuntimeError(f"Failed to load checkpoint: {e}")
+        
+        self.context_manager.replace_conversation_history(state['conversation_history'])
+        self.context_manager.replace_code_contexts(
+            CodeContext._from_dict(ctx) for ctx in state['code_contexts']
+        )
+        self.context_manager.current_context = state['current_context']
+        self.context_manager.user_preferences = state['user_preferences']
+    
+    @staticmethod
+    def _decode_checkpoint(view: memoryview) -> Dict[str, Any]:
+        """Decode a mapped checkpoint, turning code buffers back into text."""
+        if view[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+            raise ValueError("Not a context checkpoint")
+        
+        offset = len(CHECKPOINT_MAGIC)
+        payload_size, buffer_count = _CHECKPOINT_HEADER.unpack_from(view, offset)
+        offset += _CHECKPOINT_HEADER.size
+        sizes = struct.unpack_from(f"<{buffer_count}Q", view, offset)
+        offset += 8 * buffer_count
+        
+        payload = view[offset:offset + payload_size]
+        offset += payload_size
+        buffers = []
+        for size in sizes:
+            buffers.append(view[offset:offset + size])
+            offset += size
+        
+        state = pickle.loads(payload, buffers=buffers)
+        for ctx in state['code_contexts']:
+            ctx['content'] = str(ctx['content'], 'utf-8')
+        
+        payload.release()
+        for buf in buffers:
+            buf.release()
+        return state
+    
+    def attach_conversation_log(self, file_path: str) -> ConversationLog:
+        """Record messages to an append-only JSONL log, restoring any logged history."""
+        if self.context_manager.conversation_log is not None:
+            self.context_manager.conversation_log.close()
+        
+        log = ConversationLog(file_path, self.context_manager.max_conversation_memory)
+        self.context_manager.replace_conversation_history(log.read_messages())
+        self.context_manager.conversation_log = log
+        return log
     
     def get_context_summary(self) -> Dict[str, Any]:
         """Get summary of current context."""
@@ -106,21 +453,15 @@ class AIContextPersistence:
         results = []
         
         for msg in self.context_manager.conversation_history:
-            if query_lower in msg.content.lower():
+            if query_lower in msg.content_lower():
                 results.append(msg)
         
         return results
     
     def get_code_by_framework(self, framework: str) -> List[CodeContext]:
         """Get code contexts by framework."""
-        return [
-            ctx for ctx in self.context_manager.code_contexts.values()
-            if ctx.framework and ctx.framework.lower() == framework.lower()
-        ]
+        return self.context_manager._lookup_index(self.context_manager._by_framework, framework)
     
     def get_code_by_type(self, code_type: str) -> List[CodeContext]:
         """Get code contexts by type."""
-        return [
-            ctx for ctx in self.context_manager.code_contexts.values()
-            if ctx.code_type and ctx.code_type.lower() == code_type.lower()
-        ]
+        return self.context_manager._lookup_index(self.context_manager._by_type, code_type)
@@ -2,8 +2,10 @@
 Enhanced AI Assistant with advanced NLP and intelligent recommendations.
 """
 
+from collections import Counter
 from typing import Dict, List, Any, Optional
 from .ai_assistant import AIAssistant
+from .ai_file_io import read_text_file
 from .ai_nlp_models import QueryAnalysis, CodePattern, TestRecommendation
 from .ai_query_analyzer import QueryAnalyzer
 from .ai_pattern_detector import CodePatternDetector
@@ -48,20 +50,19 @@ class EnhancedAIAssistant(AIAssistant):
     
     def intelligent_analyze_code(self, source_path: str, code: Optional[str] = None) -> Dict[str, Any]:
         """Intelligent code analysis with pattern detection."""
+        # Read code once if not provided; both analyses share it
+        if code is None:
+            try:
+                code = read_text_file(source_path)
+            except Exception as e:
+                return {"success": False, "error": f"Could not read file: {e}"}
+        
         # Get base analysis
         base_analysis = self.analyze_code(source_path, code)
         
         if not base_analysis.get("success", False):
             return base_analysis
         
-        # Read code if not provided
-        if code is None:
-            try:
-                with open(source_path, 'r') as f:
-                    code = f.read()
-            except Exception as e:
-                return {"success": False, "error": f"Could not read file: {e}"}
-        
         # Detect patterns
         patterns = self.pattern_detector.analyze_code(code)
         
@@ -180,29 +181,29 @@ class EnhancedAIAssistant(AIAssistant):
             return {"success": True, "insights": [], "patterns": []}
         
         # Analyze query patterns
-        query_types = []
-        common_keywords = {}
+        query_type_counts = Counter()
+        keyword_counts = Counter()
         
         for interaction in interaction_history:
             if "query_analysis" in interaction:
-                query_types.append(interaction["query_analysis"]["type"])
-                for keyword in interaction["query_analysis"].get("keywords", []):
-                    common_keywords[keyword] = common_keywords.get(keyword, 0) + 1
+                query_analysis = interaction["query_analysis"]
+                query_type_counts[query_analysis["type"]] += 1
+                keyword_counts.update(query_analysis.get("keywords", ()))
         
         # Generate insights
         insights = []
-        if len(query_types) > 5:
-            most_common_type = max(set(query_types), key=query_types.count)
+        if sum(query_type_counts.values()) > 5:
+            most_common_type = query_type_counts.most_common(1)[0][0]
             insights.append(f"Most common query type: {most_common_type}")
         
-        if common_keywords:
-            top_keywords = sorted(common_keywords.items(), key=lambda x: x[1], reverse=True)[:5]
-            insights.append(f"Common topics: {', '.join([k for k, v in top_keywords])}")
+        top_keywords = keyword_counts.most_common(10)
+        if top_keywords:
+            insights.append(f"Common topics: {', '.join([k for k, v in top_keywords[:5]])}")
         
         return {
             "success": True,
             "insights": insights,
             "interaction_count": len(interaction_history),
-            "common_query_types": list(set(query_types)),
-            "top_keywords": dict(sorted(common_keywords.items(), key=lambda x: x[1], reverse=True)[:10])
+            "common_query_types": list(query_type_counts),
+            "top_keywords": dict(top_keywords)
         }
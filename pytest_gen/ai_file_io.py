@@ -0,0 +1,108 @@
+"""
+Fast, cached text file reads for AI assistant operations.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def _read_bytes(file_path: str, size: int) -> bytes:
+    """Read a whole file with raw os.read calls, bypassing TextIOWrapper."""
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        chunks = []
+        remaining = size
+        while True:
+            chunk = os.read(fd, max(remaining, 65536))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+# Decoded file contents keyed by path, bounded by total size and evicted FIFO
+_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def _decode_text(data: bytes) -> str:
+    """Decode UTF-8 bytes the way text-mode open() would."""
+    text = data.decode("utf-8")
+    if "\r" in text:
+        # Match text-mode universal newline handling
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _cache_put(file_path: str, mtime_ns: int, size: int, text: str) -> None:
+    """Store file content, evicting the oldest entries past the byte budget."""
+    global _cache_bytes
+    if size > _CACHE_MAX_BYTES:
+        return
+    with _cache_lock:
+        previous = _cache.pop(file_path, None)
+        if previous is not None:
+            _cache_bytes -= previous[1]
+        _cache[file_path] = (mtime_ns, size, text)
+        _cache_bytes += size
+        while _cache_bytes > _CACHE_MAX_BYTES:
+            _, (_, evicted_size, _) = _cache.popitem(last=False)
+            _cache_bytes -= evicted_size
+
+
+def read_text_file(file_path: str, st: Optional[os.stat_result] = None) -> str:
+    """Read a UTF-8 text file, reusing the content if it has not changed.
+    
+    Pass a stat result already obtained for the path to skip a second stat.
+    """
+    if st is None:
+        st = os.stat(file_path)
+    cached = _cache.get(file_path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    
+    text = _decode_text(_read_bytes(file_path, st.st_size))
+    _cache_put(file_path, st.st_mtime_ns, st.st_size, text)
+    return text
+
+
+def _read_text_or_none(file_path: str) -> Optional[str]:
+    """Read a text file, returning None if it cannot be read."""
+    try:
+        return read_text_file(file_path)
+    except Exception:
+        return None
+
+
+def read_text_files(file_paths: List[str], max_workers: int = 32) -> List[Tuple[str, str]]:
+    """Read several text files concurrently, skipping unreadable ones.
+    
+    Returns (path, content) pairs in the order the paths were given.
+    """
+    if len(file_paths) <= 1:
+        contents = [_read_text_or_none(path) for path in file_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+            contents = list(executor.map(_read_text_or_none, file_paths))
+    
+    return [(path, content) for path, content in zip(file_paths, contents) if content is not None]
+
+
+def iter_text_files(file_paths: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Read text files one at a time, in order, skipping unreadable ones.
+    
+    Unlike read_text_files, nothing is read until the caller asks for it, so
+    stopping early skips the remaining files.
+    """
+    for path in file_paths:
+        content = _read_text_or_none(path)
+        if content is not None:
+            yield path, content
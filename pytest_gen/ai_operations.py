@@ -2,15 +2,57 @@
 AI assistant operations and utilities.
 """
 
+import io
 import os
-from typing import Dict, List, Any, Optional
+import re
+import threading
+from typing import Dict, Iterator, List, Any, Optional
 from .ai_prompts import PromptTemplates, PromptType
+from .ai_file_io import iter_text_files, read_text_file, read_text_files
 
-# Optional imports for AI functionality
-try:
-    import tiktoken
-except ImportError:
-    tiktoken = None
+# Process-wide token encoder; tiktoken is optional and imported on first use
+_token_encoder = None
+_token_encoder_loaded = False
+_token_encoder_lock = threading.Lock()
+
+# Single-pass classifiers used to fill the test strategy prompt
+_FRAMEWORK_RE = re.compile(
+    r"^\s*(?:import (pytest|unittest|nose)\b|from (pytest|unittest|nose)\b)",
+    re.MULTILINE
+)
+_JAVA_RE = re.compile(
+    r"^\s*(?:package\s+[\w.]+;|import\s+[\w.]+(?:\.\*)?;|public\s+(?:final\s+)?class\s)",
+    re.MULTILINE
+)
+
+
+def get_token_encoder():
+    """Load the tiktoken encoder once per process (None if unavailable)."""
+    global _token_encoder, _token_encoder_loaded
+    if not _token_encoder_loaded:
+        with _token_encoder_lock:
+            if not _token_encoder_loaded:
+                try:
+                    import tiktoken
+                    _token_encoder = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    _token_encoder = None
+                _token_encoder_loaded = True
+    return _token_encoder
+
+
+def detect_code_type(code: str) -> str:
+    """Detect the source language of code."""
+    return "Java" if _JAVA_RE.search(code) else "Python"
+
+
+def detect_test_framework(code: str) -> str:
+    """Detect the test framework imported by code."""
+    found = {m.group(1) or m.group(2) for m in _FRAMEWORK_RE.finditer(code)}
+    for framework in ("pytest", "unittest", "nose"):
+        if framework in found:
+            return framework
+    return "Unknown"
 
 
 class AIOperations:
@@ -20,24 +62,39 @@ class AIOperations:
         self.prompts = prompts
         self.provider = provider
         self.token_encoder = token_encoder
+        # The system prompt is constant, so every conversation prompt shares this prefix
+        self._system_prefix = prompts.get_prompt(PromptType.SYSTEM) + "\n\n"
     
     def generate_response_with_context(self, question: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Generate AI response with context."""
-        # Build conversation prompt
+        return self.provider.call_api(self._build_conversation_prompt(question, context))
+    
+    def generate_responses_with_context(self, questions: List[str],
+                                        contexts: List[Dict[str, Any]]) -> List[Any]:
+        """Generate AI responses for several questions in one provider batch.
+        
+        Each result is a response dict, or the exception raised for that question.
+        """
+        prompts = [
+            self._build_conversation_prompt(question, context)
+            for question, context in zip(questions, contexts)
+        ]
+        return self.provider.call_api_batch(prompts)
+    
+    def stream_response_with_context(self, question: str, context: Dict[str, Any]) -> Iterator[str]:
+        """Stream AI response chunks with context."""
+        return self.provider.stream_api(self._build_conversation_prompt(question, context))
+    
+    def _build_conversation_prompt(self, question: str, context: Dict[str, Any]) -> str:
+        """Build the full conversation prompt for a question."""
+        # The formatter stringifies the code itself, so no str() copy is needed here
         conversation_prompt = self.prompts.get_prompt(
             PromptType.CONVERSATION,
             question=question,
-            context=str(context.get("current_code", "")),
+            context=context.get("current_code", ""),
             conversation_history=context.get("conversation_history", "")
         )
-        
-        # Add system prompt
-        system_prompt = self.prompts.get_prompt(PromptType.SYSTEM)
-        
-        # Combine prompts
-        full_prompt = f"{system_prompt}\n\n{conversation_prompt}"
-        
-        return self.provider.call_api(full_prompt)
+        return self._system_prefix + conversation_prompt
     
     def analyze_code_with_prompt(self, code: str, file_path: str) -> Dict[str, Any]:
         """Analyze code using test strategy prompt."""
@@ -45,8 +102,8 @@ class AIOperations:
         prompt = self.prompts.get_prompt(
             PromptType.TEST_STRATEGY,
             code=code,
-            code_type="Python",  # TODO: Detect from code
-            framework="Unknown"   # TODO: Detect from code
+            code_type=detect_code_type(code),
+            framework=detect_test_framework(code)
         )
         
         response = self.provider.call_api(prompt)
@@ -74,27 +131,35 @@ class AIOperations:
             "tokens_used": response.get("tokens_used", 0)
         }
     
-    def explain_generation_with_prompt(self, test_files: List[str]) -> Dict[str, Any]:
-        """Explain test generation using code explanation prompt."""
-        # Read test file contents
-        test_contents = []
-        for file_path in test_files:
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                    test_contents.append(f"File: {file_path}\n{content}")
-            except Exception:
-                continue
+    def explain_generation_with_prompt(self, test_files: List[str],
+                                       max_chars: Optional[int] = None) -> Dict[str, Any]:
+        """Explain test generation using code explanation prompt.
         
-        combined_tests = "\n\n".join(test_contents)
+        The combined test code is capped at max_chars, if given; files past
+        the cap are left out.
+        """
+        # Unreadable files are skipped. Without a cap all files are needed, so
+        # read them concurrently; with one, read lazily and stop at the cap.
+        if max_chars is None:
+            files = read_text_files(test_files)
+        else:
+            files = iter_text_files(test_files)
         
-        prompt = self.prompts.get_prompt(
-            PromptType.CODE_EXPLANATION,
-            code=combined_tests,
-            config="Default configuration"
-        )
+        buf = io.StringIO()
+        remaining = max_chars
+        for file_path, content in files:
+            for piece in ("\n\n" if buf.tell() else "", "File: ", file_path, "\n", content):
+                if remaining is not None:
+                    if len(piece) > remaining:
+                        piece = piece[:remaining]
+                    remaining -= len(piece)
+                buf.write(piece)
+            if remaining == 0:
+                break
         
-        response = self.provider.call_api(prompt)
+        combined_tests = buf.getvalue()
+        
+        response = self.provider.call_api(self.build_explanation_prompt(combined_tests))
         
         return {
             "success": True,
@@ -103,6 +168,14 @@ class AIOperations:
             "tokens_used": response.get("tokens_used", 0)
         }
     
+    def build_explanation_prompt(self, combined_tests: str) -> str:
+        """Build the code explanation prompt for the combined test code."""
+        return self.prompts.get_prompt(
+            PromptType.CODE_EXPLANATION,
+            code=combined_tests,
+            config="Default configuration"
+        )
+    
     def get_best_practices_with_prompt(self, topic: str, context: str = "") -> Dict[str, Any]:
         """Get best practices using best practices prompt."""
         prompt = self.prompts.get_prompt(
@@ -123,25 +196,24 @@ class AIOperations:
     def read_file_safely(self, file_path: str) -> str:
         """Read file content safely."""
         try:
-            with open(file_path, 'r') as f:
-                return f.read()
+            return read_text_file(file_path)
         except Exception as e:
             raise Exception(f"Failed to read file: {str(e)}")
     
-    def count_tokens_in_text(self, text: str) -> int:
-        """Count tokens in text."""
-        if self.token_encoder:
-            return len(self.token_encoder.encode(text))
+    def count_tokens_in_text(self, text: str, exact: bool = True) -> int:
+        """Count tokens in text.
+        
+        Pass exact=False for a length-based estimate that skips tokenization,
+        for rough checks where an approximate size is enough.
+        """
+        if exact and self.token_encoder:
+            # encode_ordinary skips the special-token scan; counts are identical
+            encode = getattr(self.token_encoder, "encode_ordinary", self.token_encoder.encode)
+            return len(encode(text))
         else:
             # Rough estimation: 1 token ≈ 4 characters
             return len(text) // 4
     
     def initialize_token_encoder(self):
         """Initialize token encoder for counting tokens."""
-        try:
-            if tiktoken:
-                return tiktoken.get_encoding("cl100k_base")
-            else:
-                return None
-        except Exception:
-            return None
+        return get_token_encoder()
@@ -2,83 +2,150 @@
 Intelligent code pattern detection for test recommendations.
 """
 
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Set
 from .ai_nlp_models import CodePattern, CodeComplexity
 
+# Matches once per line that contains any complexity keyword
+_COMPLEX_LINE_RE = re.compile(r"^.*?(?:try:|except:|if |for |while )", re.MULTILINE)
+
+# Pattern type names, shared by the pattern table and the insight checks
+ASYNC_FUNCTION = "async_function"
+DATABASE_OPERATIONS = "database_operations"
+API_ENDPOINT = "api_endpoint"
+FILE_OPERATIONS = "file_operations"
+AUTHENTICATION = "authentication"
+
+# Complexity levels from lowest to highest, and each level's position
+_COMPLEXITY_ORDER = (CodeComplexity.SIMPLE, CodeComplexity.MEDIUM,
+                     CodeComplexity.COMPLEX, CodeComplexity.ENTERPRISE)
+_COMPLEXITY_RANK = {level: rank for rank, level in enumerate(_COMPLEXITY_ORDER)}
+
+# Known code patterns; indicators are substrings searched for in the code
+_PATTERNS = {
+    ASYNC_FUNCTION: {
+        "indicators": ("async def", "await"),
+        "test_recommendations": [
+            "Use pytest-asyncio for async testing",
+            "Test both success and error cases",
+            "Mock async dependencies properly"
+        ],
+        "mock_strategies": [
+            "Use AsyncMock for async dependencies",
+            "Patch async context managers"
+        ]
+    },
+    DATABASE_OPERATIONS: {
+        "indicators": ("db.", "session.", "query(", "SQL"),
+        "test_recommendations": [
+            "Use database fixtures",
+            "Test with test database",
+            "Verify transactions"
+        ],
+        "mock_strategies": [
+            "Mock database connections",
+            "Use in-memory database for tests"
+        ]
+    },
+    API_ENDPOINT: {
+        "indicators": ("@app.route", "@router", "FastAPI", "Flask"),
+        "test_recommendations": [
+            "Test HTTP status codes",
+            "Test request/response formats",
+            "Test authentication"
+        ],
+        "mock_strategies": [
+            "Mock external API calls",
+            "Use test client"
+        ]
+    },
+    FILE_OPERATIONS: {
+        "indicators": ("open(", "read", "write", "Path("),
+        "test_recommendations": [
+            "Test file existence",
+            "Test file permissions",
+            "Test error handling"
+        ],
+        "mock_strategies": [
+            "Mock file system operations",
+            "Use temporary files"
+        ]
+    },
+    AUTHENTICATION: {
+        "indicators": ("login", "auth", "token", "session", "jwt"),
+        "test_recommendations": [
+            "Test authentication flows",
+            "Test authorization levels",
+            "Test token validation"
+        ],
+        "mock_strategies": [
+            "Mock authentication services",
+            "Use test user fixtures"
+        ]
+    }
+}
+
+_PATTERN_DESCRIPTIONS = {
+    ASYNC_FUNCTION: "Asynchronous function requiring special testing",
+    DATABASE_OPERATIONS: "Database interaction requiring data fixtures",
+    API_ENDPOINT: "API endpoint requiring HTTP testing",
+    FILE_OPERATIONS: "File system operations requiring I/O mocking",
+    AUTHENTICATION: "Authentication/authorization requiring security testing"
+}
+
+
+def _indicator_regex(indicator: str) -> str:
+    """Get the regex for an indicator; ones starting with a letter or digit must not follow one.
+    
+    '_' and '.' still count as separators, so 'access_token' and 'mock_open('
+    match while 'redb.conf' and 'thread' do not.
+    """
+    escaped = re.escape(indicator)
+    return r"(?<![A-Za-z0-9])" + escaped if indicator[:1].isalnum() else escaped
+
+
+def _compile_indicators(patterns: Dict[str, Dict[str, Any]]):
+    """Compile every pattern indicator into one regex scanned in a single pass.
+    
+    The alternation sits in a lookahead so a match is tried at every offset.
+    Longer indicators are listed first, and each match also counts the
+    indicators that are its prefix, so indicators sharing a start position
+    (such as 'session' and 'session.') are all reported.
+    """
+    indicators = sorted({ind for info in patterns.values() for ind in info["indicators"]},
+                        key=len, reverse=True)
+    regex = re.compile("(?=(" + "|".join(map(_indicator_regex, indicators)) + "))")
+    prefixes = {ind: frozenset(other for other in indicators if ind.startswith(other))
+                for ind in indicators}
+    return regex, prefixes
+
+
+# Indicator regex and prefix table, compiled once at import
+_INDICATOR_MATCHER = _compile_indicators(_PATTERNS)
+
 
 class CodePatternDetector:
     """Detects patterns in code for intelligent test recommendations."""
     
     def __init__(self):
-        self.patterns = {
-            "async_function": {
-                "indicators": ["async def", "await"],
-                "test_recommendations": [
-                    "Use pytest-asyncio for async testing",
-                    "Test both success and error cases",
-                    "Mock async dependencies properly"
-                ],
-                "mock_strategies": [
-                    "Use AsyncMock for async dependencies",
-                    "Patch async context managers"
-                ]
-            },
-            "database_operations": {
-                "indicators": ["db.", "session.", "query(", "SQL"],
-                "test_recommendations": [
-                    "Use database fixtures",
-                    "Test with test database",
-                    "Verify transactions"
-                ],
-                "mock_strategies": [
-                    "Mock database connections",
-                    "Use in-memory database for tests"
-                ]
-            },
-            "api_endpoint": {
-                "indicators": ["@app.route", "@router", "FastAPI", "Flask"],
-                "test_recommendations": [
-                    "Test HTTP status codes",
-                    "Test request/response formats",
-                    "Test authentication"
-                ],
-                "mock_strategies": [
-                    "Mock external API calls",
-                    "Use test client"
-                ]
-            },
-            "file_operations": {
-                "indicators": ["open(", "read", "write", "Path("],
-                "test_recommendations": [
-                    "Test file existence",
-                    "Test file permissions",
-                    "Test error handling"
-                ],
-                "mock_strategies": [
-                    "Mock file system operations",
-                    "Use temporary files"
-                ]
-            },
-            "authentication": {
-                "indicators": ["login", "auth", "token", "session", "jwt"],
-                "test_recommendations": [
-                    "Test authentication flows",
-                    "Test authorization levels",
-                    "Test token validation"
-                ],
-                "mock_strategies": [
-                    "Mock authentication services",
-                    "Use test user fixtures"
-                ]
-            }
-        }
+        self.patterns = _PATTERNS
+    
+    def _match_indicators(self, code: str) -> Set[str]:
+        """Get the set of indicators found in the code."""
+        regex, prefixes = _INDICATOR_MATCHER
+        found: Set[str] = set()
+        for match in set(regex.findall(code)):
+            found |= prefixes[match]
+        return found
     
     def analyze_code(self, code: str) -> List[CodePattern]:
         """Analyze code and detect patterns."""
         detected_patterns = []
+        found = self._match_indicators(code)
         
         for pattern_name, pattern_info in self.patterns.items():
-            confidence = self._calculate_pattern_confidence(code, pattern_info["indicators"])
+            indicators = pattern_info["indicators"]
+            confidence = len(found.intersection(indicators)) / len(indicators) if indicators else 0
             
             if confidence > 0.3:  # Threshold for pattern detection
                 complexity = self._determine_complexity(code, pattern_name)
@@ -95,25 +162,12 @@ class CodePatternDetector:
         
         return detected_patterns
     
-    def _calculate_pattern_confidence(self, code: str, indicators: List[str]) -> float:
-        """Calculate confidence for a pattern match."""
-        matches = 0
-        for indicator in indicators:
-            if indicator in code:
-                matches += 1
-        
-        return matches / len(indicators) if indicators else 0
-    
     def _determine_complexity(self, code: str, pattern_type: str) -> CodeComplexity:
         """Determine code complexity level."""
-        lines = code.split('\n')
-        line_count = len(lines)
+        line_count = code.count('\n') + 1
         
-        # Count complexity indicators
-        complexity_indicators = 0
-        for line in lines:
-            if any(keyword in line for keyword in ["try:", "except:", "if ", "for ", "while "]):
-                complexity_indicators += 1
+        # Count lines with complexity indicators
+        complexity_indicators = len(_COMPLEX_LINE_RE.findall(code))
         
         if line_count > 100 or complexity_indicators > 20:
             return CodeComplexity.ENTERPRISE
@@ -126,45 +180,30 @@ class CodePatternDetector:
     
     def _get_pattern_description(self, pattern_type: str) -> str:
         """Get human-readable description of pattern."""
-        descriptions = {
-            "async_function": "Asynchronous function requiring special testing",
-            "database_operations": "Database interaction requiring data fixtures",
-            "api_endpoint": "API endpoint requiring HTTP testing",
-            "file_operations": "File system operations requiring I/O mocking",
-            "authentication": "Authentication/authorization requiring security testing"
-        }
-        return descriptions.get(pattern_type, "Detected code pattern")
+        return _PATTERN_DESCRIPTIONS.get(pattern_type, "Detected code pattern")
     
     def get_pattern_insights(self, patterns: List[CodePattern]) -> Dict[str, Any]:
         """Get insights from detected patterns."""
         if not patterns:
             return {"insights": [], "complexity": "simple", "recommendations": []}
         
-        # Analyze complexity distribution
-        complexity_counts = {}
+        # One pass for the highest complexity and the pattern types present
+        rank = 0
+        pattern_types = set()
         for pattern in patterns:
-            complexity = pattern.complexity.value
-            complexity_counts[complexity] = complexity_counts.get(complexity, 0) + 1
-        
-        # Determine overall complexity
-        if complexity_counts.get("enterprise", 0) > 0:
-            overall_complexity = "enterprise"
-        elif complexity_counts.get("complex", 0) > 0:
-            overall_complexity = "complex"
-        elif complexity_counts.get("medium", 0) > 0:
-            overall_complexity = "medium"
-        else:
-            overall_complexity = "simple"
+            rank = max(rank, _COMPLEXITY_RANK[pattern.complexity])
+            pattern_types.add(pattern.pattern_type)
+        overall_complexity = _COMPLEXITY_ORDER[rank].value
         
         # Generate insights
         insights = []
         if len(patterns) > 3:
             insights.append("Multiple patterns detected - consider comprehensive test suite")
         
-        if any(p.pattern_type == "async_function" for p in patterns):
+        if ASYNC_FUNCTION in pattern_types:
             insights.append("Async code detected - ensure proper async testing setup")
         
-        if any(p.pattern_type == "database_operations" for p in patterns):
+        if DATABASE_OPERATIONS in pattern_types:
             insights.append("Database operations detected - plan for data management in tests")
         
         return {
@@ -175,19 +214,10 @@ class CodePatternDetector:
     
     def _generate_pattern_recommendations(self, patterns: List[CodePattern]) -> List[str]:
         """Generate recommendations based on patterns."""
-        recommendations = []
-        
-        # Collect all recommendations
-        for pattern in patterns:
-            recommendations.extend(pattern.test_recommendations)
-            recommendations.extend(pattern.mock_strategies)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_recommendations = []
-        for rec in recommendations:
-            if rec not in seen:
-                seen.add(rec)
-                unique_recommendations.append(rec)
-        
-        return unique_recommendations
+        # dict.fromkeys drops duplicates while preserving order
+        return list(dict.fromkeys(
+            rec
+            for pattern in patterns
+            for recs in (pattern.test_recommendations, pattern.mock_strategies)
+            for rec in recs
+        ))
@@ -2,9 +2,33 @@
 Prompt formatting utilities for AI assistant.
 """
 
-from typing import Dict, Any
+import string
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 from .ai_prompt_templates import PromptTemplates
 
+_FORMATTER = string.Formatter()
+
+
+@lru_cache(maxsize=64)
+def _format_plan(template: str) -> Tuple[Tuple[str, Optional[str], Optional[str], Optional[str]], ...]:
+    """Parse a template into (literal, field, spec, conversion) parts once."""
+    return tuple(_FORMATTER.parse(template))
+
+
+def _render(template: str, **values: Any) -> str:
+    """Fill a template like str.format, reusing its parsed plan."""
+    parts = []
+    for literal, field_name, spec, conversion in _format_plan(template):
+        parts.append(literal)
+        if field_name is not None:
+            value = values[field_name]
+            if conversion:
+                value = _FORMATTER.convert_field(value, conversion)
+            parts.append(format(value, spec))
+    return "".join(parts)
+
 
 class PromptFormatters:
     """Utility class for formatting AI prompts."""
@@ -12,7 +36,8 @@ class PromptFormatters:
     @staticmethod
     def format_test_strategy_prompt(template: str, **kwargs) -> str:
         """Format test strategy prompt."""
-        return template.format(
+        return _render(
+            template,
             code_type=kwargs.get('code_type', 'Python'),
             framework=kwargs.get('framework', 'Unknown'),
             code=kwargs.get('code', '')
@@ -21,7 +46,8 @@ class PromptFormatters:
     @staticmethod
     def format_coverage_analysis_prompt(template: str, **kwargs) -> str:
         """Format coverage analysis prompt."""
-        return template.format(
+        return _render(
+            template,
             source_code=kwargs.get('source_code', ''),
             existing_tests=kwargs.get('existing_tests', '')
         )
@@ -29,7 +55,8 @@ class PromptFormatters:
     @staticmethod
     def format_mock_recommendation_prompt(template: str, **kwargs) -> str:
         """Format mock recommendation prompt."""
-        return template.format(
+        return _render(
+            template,
             code=kwargs.get('code', ''),
             dependencies=kwargs.get('dependencies', [])
         )
@@ -37,7 +64,8 @@ class PromptFormatters:
     @staticmethod
     def format_configuration_help_prompt(template: str, **kwargs) -> str:
         """Format configuration help prompt."""
-        return template.format(
+        return _render(
+            template,
             requirements=kwargs.get('requirements', ''),
             code_type=kwargs.get('code_type', 'Python'),
             framework=kwargs.get('framework', 'Unknown')
@@ -46,7 +74,8 @@ class PromptFormatters:
     @staticmethod
     def format_error_resolution_prompt(template: str, **kwargs) -> str:
         """Format error resolution prompt."""
-        return template.format(
+        return _render(
+            template,
             error_message=kwargs.get('error_message', ''),
             code=kwargs.get('code', ''),
             config=kwargs.get('config', '')
@@ -55,7 +84,8 @@ class PromptFormatters:
     @staticmethod
     def format_code_explanation_prompt(template: str, **kwargs) -> str:
         """Format code explanation prompt."""
-        return template.format(
+        return _render(
+            template,
             code=kwargs.get('code', ''),
             config=kwargs.get('config', '')
         )
@@ -63,7 +93,8 @@ class PromptFormatters:
     @staticmethod
     def format_best_practices_prompt(template: str, **kwargs) -> str:
         """Format best practices prompt."""
-        return template.format(
+        return _render(
+            template,
             topic=kwargs.get('topic', 'general testing'),
             context=kwargs.get('context', '')
         )
@@ -71,53 +102,55 @@ class PromptFormatters:
     @staticmethod
     def format_conversation_prompt(template: str, **kwargs) -> str:
         """Format conversation prompt."""
-        return template.format(
+        return _render(
+            template,
             context=kwargs.get('context', ''),
             conversation_history=kwargs.get('conversation_history', ''),
             question=kwargs.get('question', '')
         )
 
 
+def _load_templates() -> Mapping[str, str]:
+    """Load all prompt templates."""
+    return MappingProxyType({
+        "system": PromptTemplates.system_prompt(),
+        "test_strategy": PromptTemplates.test_strategy_prompt(),
+        "coverage_analysis": PromptTemplates.coverage_analysis_prompt(),
+        "mock_recommendation": PromptTemplates.mock_recommendation_prompt(),
+        "configuration_help": PromptTemplates.configuration_help_prompt(),
+        "error_resolution": PromptTemplates.error_resolution_prompt(),
+        "code_explanation": PromptTemplates.code_explanation_prompt(),
+        "best_practices": PromptTemplates.best_practices_prompt(),
+        "conversation": PromptTemplates.conversation_prompt()
+    })
+
+
 class PromptManager:
     """Manager for AI prompt templates."""
     
+    # The templates are constant, so they are built once and shared read-only
+    TEMPLATES = _load_templates()
+    
+    # Formatter per prompt type; types without an entry are returned verbatim
+    _FORMATTERS = {
+        "test_strategy": PromptFormatters.format_test_strategy_prompt,
+        "coverage_analysis": PromptFormatters.format_coverage_analysis_prompt,
+        "mock_recommendation": PromptFormatters.format_mock_recommendation_prompt,
+        "configuration_help": PromptFormatters.format_configuration_help_prompt,
+        "error_resolution": PromptFormatters.format_error_resolution_prompt,
+        "code_explanation": PromptFormatters.format_code_explanation_prompt,
+        "best_practices": PromptFormatters.format_best_practices_prompt,
+        "conversation": PromptFormatters.format_conversation_prompt,
+    }
+    
     def __init__(self):
-        self.templates = self._load_templates()
+        self.templates = self.TEMPLATES
         self.formatters = PromptFormatters()
     
-    def _load_templates(self) -> dict:
-        """Load all prompt templates."""
-        return {
-            "system": PromptTemplates.system_prompt(),
-            "test_strategy": PromptTemplates.test_strategy_prompt(),
-            "coverage_analysis": PromptTemplates.coverage_analysis_prompt(),
-            "mock_recommendation": PromptTemplates.mock_recommendation_prompt(),
-            "configuration_help": PromptTemplates.configuration_help_prompt(),
-            "error_resolution": PromptTemplates.error_resolution_prompt(),
-            "code_explanation": PromptTemplates.code_explanation_prompt(),
-            "best_practices": PromptTemplates.best_practices_prompt(),
-            "conversation": PromptTemplates.conversation_prompt()
-        }
-    
     def get_prompt(self, prompt_type: str, **kwargs) -> str:
         """Get a formatted prompt template."""
         template = self.templates.get(prompt_type, "")
-        
-        if prompt_type == "test_strategy":
-            return self.formatters.format_test_strategy_prompt(template, **kwargs)
-        elif prompt_type == "coverage_analysis":
-            return self.formatters.format_coverage_analysis_prompt(template, **kwargs)
-        elif prompt_type == "mock_recommendation":
-            return self.formatters.format_mock_recommendation_prompt(template, **kwargs)
-        elif prompt_type == "configuration_help":
-            return self.formatters.format_configuration_help_prompt(template, **kwargs)
-        elif prompt_type == "error_resolution":
-            return self.formatters.format_error_resolution_prompt(template, **kwargs)
-        elif prompt_type == "code_explanation":
-            return self.formatters.format_code_explanation_prompt(template, **kwargs)
-        elif prompt_type == "best_practices":
-            return self.formatters.format_best_practices_prompt(template, **kwargs)
-        elif prompt_type == "conversation":
-            return self.formatters.format_conversation_prompt(template, **kwargs)
-        
-        return template
\ No newline at end of file
+        formatter = self._FORMATTERS.get(prompt_type)
+        if formatter is None:
+            return template
+        return formatter(template, **kwargs)
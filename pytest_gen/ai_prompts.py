@@ -21,11 +21,8 @@ class PromptType(Enum):
 
 
 class PromptTemplates(PromptManager):
-    """Manager for AI prompt templates."""
-    
-    def __init__(self):
-        super().__init__()
+    """Manager for AI prompt templates, addressed by PromptType."""
     
     def get_prompt(self, prompt_type: PromptType, **kwargs) -> str:
         """Get a formatted prompt template."""
-        return super().get_prompt(prompt_type.value, **kwargs)
\ No newline at end of file
+        return super().get_prompt(prompt_type.value, **kwargs)
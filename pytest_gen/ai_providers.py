@@ -2,18 +2,65 @@
 AI provider implementations for different LLM services.
 """
 
-from typing import Dict, Any, Optional
+import dataclasses
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 
 
 class AIProviderBase:
     """Base class for AI providers."""
     
+    # Upper bound on concurrent requests from one call_api_batch, to stay
+    # within provider rate limits however many prompts are passed
+    MAX_BATCH_WORKERS = 8
+    
     def __init__(self, config):
         self.config = config
+        self._client = None
+        self._client_lock = threading.Lock()
     
     def call_api(self, prompt: str) -> Dict[str, Any]:
         """Call the AI API and return response."""
         raise NotImplementedError
+    
+    def _get_client(self, factory):
+        """Return this provider's HTTP client, creating it on first use.
+        
+        Reusing one client keeps its keep-alive connection pool warm.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = factory()
+        return self._client
+    
+    def stream_api(self, prompt: str) -> Iterator[str]:
+        """Call the AI API and yield the response text as it arrives.
+        
+        Providers without streaming support yield the full response once.
+        """
+        yield self.call_api(prompt)["content"]
+    
+    def call_api_batch(self, prompts: List[str]) -> List[Union[Dict[str, Any], Exception]]:
+        """Call the AI API for several prompts, overlapping their round trips.
+        
+        At most MAX_BATCH_WORKERS requests are in flight at once. Results are
+        returned in prompt order; a failed prompt yields its exception.
+        """
+        def call(prompt: str) -> Union[Dict[str, Any], Exception]:
+            try:
+                return self.call_api(prompt)
+            except Exception as e:
+                return e
+        
+        if len(prompts) == 1:
+            return [call(prompts[0])]
+        
+        with ThreadPoolExecutor(max_workers=min(len(prompts), self.MAX_BATCH_WORKERS)) as executor:
+            return list(executor.map(call, prompts))
 
 
 class OpenAIProvider(AIProviderBase):
@@ -27,10 +74,10 @@ class OpenAIProvider(AIProviderBase):
             raise Exception("OpenAI library not installed. Install with: pip install openai")
         
         try:
-            client = openai.OpenAI(
+            client = self._get_client(lambda: openai.OpenAI(
                 api_key=self.config.api_key,
                 base_url=self.config.base_url
-            )
+            ))
             
             response = client.chat.completions.create(
                 model=self.config.model,
@@ -51,6 +98,35 @@ class OpenAIProvider(AIProviderBase):
             
         except Exception as e:
             raise Exception(f"OpenAI API error: {str(e)}")
+    
+    def stream_api(self, prompt: str) -> Iterator[str]:
+        """Stream OpenAI API response chunks."""
+        try:
+            import openai
+        except ImportError:
+            raise Exception("OpenAI library not installed. Install with: pip install openai")
+        
+        try:
+            client = self._get_client(lambda: openai.OpenAI(
+                api_key=self.config.api_key,
+                base_url=self.config.base_url
+            ))
+            
+            stream = client.chat.completions.create(
+                model=self.config.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                timeout=self.config.timeout,
+                stream=True
+            )
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            
+        except Exception as e:
+            raise Exception(f"OpenAI API error: {str(e)}")
 
 
 class AnthropicProvider(AIProviderBase):
@@ -64,7 +140,7 @@ class AnthropicProvider(AIProviderBase):
             raise Exception("Anthropic library not installed. Install with: pip install anthropic")
         
         try:
-            client = anthropic.Anthropic(api_key=self.config.api_key)
+            client = self._get_client(lambda: anthropic.Anthropic(api_key=self.config.api_key))
             
             response = client.messages.create(
                 model=self.config.model,
@@ -84,6 +160,27 @@ class AnthropicProvider(AIProviderBase):
             
         except Exception as e:
             raise Exception(f"Anthropic API error: {str(e)}")
+    
+    def stream_api(self, prompt: str) -> Iterator[str]:
+        """Stream Anthropic API response text."""
+        try:
+            import anthropic
+        except ImportError:
+            raise Exception("Anthropic library not installed. Install with: pip install anthropic")
+        
+        try:
+            client = self._get_client(lambda: anthropic.Anthropic(api_key=self.config.api_key))
+            
+            with client.messages.stream(
+                model=self.config.model,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                yield from stream.text_stream
+            
+        except Exception as e:
+            raise Exception(f"Anthropic API error: {str(e)}")
 
 
 class OllamaProvider(AIProviderBase):
@@ -110,7 +207,8 @@ class OllamaProvider(AIProviderBase):
                 }
             }
             
-            response = requests.post(url, json=data, timeout=self.config.timeout)
+            session = self._get_client(requests.Session)
+            response = session.post(url, json=data, timeout=self.config.timeout)
             response.raise_for_status()
             
             result = response.json()
@@ -124,13 +222,79 @@ class OllamaProvider(AIProviderBase):
             
         except Exception as e:
             raise Exception(f"Ollama API error: {str(e)}")
+    
+    def stream_api(self, prompt: str) -> Iterator[str]:
+        """Stream Ollama API response chunks (newline-delimited JSON)."""
+        try:
+            import json
+            import requests
+        except ImportError:
+            raise Exception("Requests library not installed. Install with: pip install requests")
+        
+        try:
+            base_url = self.config.base_url or "http://localhost:11434"
+            url = f"{base_url}/api/generate"
+            
+            data = {
+                "model": self.config.model,
+                "prompt": prompt,
+                "stream": True,
+                "options": {
+                    "temperature": self.config.temperature,
+                    "num_predict": self.config.max_tokens
+                }
+            }
+            
+            session = self._get_client(requests.Session)
+            with session.post(url, json=data, timeout=self.config.timeout, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    result = json.loads(line)
+                    if result.get("response"):
+                        yield result["response"]
+                    if result.get("done"):
+                        break
+            
+        except Exception as e:
+            raise Exception(f"Ollama API error: {str(e)}")
 
 
 class AIProviderFactory:
     """Factory for creating AI providers."""
     
+    # Providers shared across assistants with identical settings, so their
+    # HTTP clients and connection pools are reused. Keyed by a digest of the
+    # settings so API keys are not kept as dict keys; least recently used
+    # providers are dropped past MAX_SHARED_PROVIDERS.
+    MAX_SHARED_PROVIDERS = 8
+    _instances: "OrderedDict[Tuple[str, str], AIProviderBase]" = OrderedDict()
+    _instances_lock = threading.Lock()
+    
     @staticmethod
     def create_provider(provider_type: str, config) -> AIProviderBase:
+        """Get the shared provider for a type and configuration."""
+        if not dataclasses.is_dataclass(config):
+            return AIProviderFactory._build_provider(provider_type, config)
+        
+        settings = repr(dataclasses.astuple(config)).encode("utf-8")
+        key = (provider_type.lower(), hashlib.sha256(settings).hexdigest())
+        instances = AIProviderFactory._instances
+        with AIProviderFactory._instances_lock:
+            provider = instances.get(key)
+            if provider is not None:
+                instances.move_to_end(key)
+                return provider
+            # Snapshot the settings so the shared provider matches its key
+            provider = AIProviderFactory._build_provider(provider_type, dataclasses.replace(config))
+            instances[key] = provider
+            if len(instances) > AIProviderFactory.MAX_SHARED_PROVIDERS:
+                instances.popitem(last=False)
+        return provider
+    
+    @staticmethod
+    def _build_provider(provider_type: str, config) -> AIProviderBase:
         """Create provider based on type."""
         providers = {
             "openai": OpenAIProvider,
@@ -2,13 +2,17 @@
 AI chat widget component creation and management.
 """
 
+import time
 import panel as pn
-from typing import Dict
+from typing import Dict, Tuple
 
 
 class AIWidgetComponents:
     """Component creation for AI chat widget."""
     
+    # (epoch second, formatted) of the last timestamp; display resolution is 1s
+    _last_timestamp: Tuple[int, str] = (-1, "")
+    
     @staticmethod
     def create_chat_display():
         """Create chat display widget."""
@@ -135,6 +139,10 @@ class AIWidgetComponents:
     
     @staticmethod
     def get_timestamp() -> str:
-        """Get current timestamp string."""
-        from datetime import datetime
-        return datetime.now().strftime("%H:%M:%S")
+        """Get current timestamp string, formatted at most once per second."""
+        now = int(time.time())
+        second, formatted = AIWidgetComponents._last_timestamp
+        if now != second:
+            formatted = time.strftime("%H:%M:%S", time.localtime(now))
+            AIWidgetComponents._last_timestamp = (now, formatted)
+        return formatted
@@ -8,7 +8,6 @@ from .ai_commands import (
     ask_command, explain_command, suggest_command, review_command, 
     assistant_command, ai_status_command
 )
-from .ai_enhanced_assistant import EnhancedAIAssistant
 
 
 @click.command()
@@ -20,6 +19,7 @@ def ask(question, file, verbose, enhanced):
     """Ask the AI assistant a question about testing."""
     if enhanced:
         # Use enhanced AI assistant
+        from .ai_enhanced_assistant import EnhancedAIAssistant
         try:
             assistant = EnhancedAIAssistant()
             init_result = assistant.initialize()
@@ -67,7 +67,7 @@ def ask(question, file, verbose, enhanced):
             sys.exit(1)
     else:
         # Use standard AI assistant
-        ask_command(question, file, verbose)
+        ask_command.callback(question, file, verbose)
 
 
 @click.command()
@@ -75,7 +75,7 @@ def ask(question, file, verbose, enhanced):
 @click.option('--verbose', '-v', is_flag=True, help='Show detailed explanation')
 def explain(test_file, verbose):
     """Explain what tests will be generated or what existing tests do."""
-    explain_command(test_file, verbose)
+    explain_command.callback(test_file, verbose)
 
 
 @click.command()
@@ -84,7 +84,7 @@ def explain(test_file, verbose):
 @click.option('--verbose', '-v', is_flag=True, help='Show detailed suggestions')
 def suggest(source_file, tests, verbose):
     """Suggest test improvements or new tests for source code."""
-    suggest_command(source_file, tests, verbose)
+    suggest_command.callback(source_file, tests, verbose)
 
 
 @click.command()
@@ -93,20 +93,23 @@ def suggest(source_file, tests, verbose):
 @click.option('--verbose', '-v', is_flag=True, help='Show token usage')
 def review(test_directory, detailed, verbose):
     """Review all tests in a directory and provide feedback."""
-    review_command(test_directory, detailed, verbose)
+    review_command.callback(test_directory, detailed, verbose)
 
 
 @click.command()
 @click.option('--interactive', '-i', is_flag=True, help='Start interactive mode')
-def assistant(interactive):
+@click.option('--file', '-f', help='File to provide as context for the whole session')
+@click.option('--batch', '-b', is_flag=True,
+              help='Answer piped questions in one batch; each sees only the earlier session')
+def assistant(interactive, file, batch):
     """Launch AI assistant in interactive mode."""
-    assistant_command(interactive)
+    assistant_command.callback(interactive, file, batch)
 
 
 @click.command()
 def ai_status():
     """Check AI assistant configuration and status."""
-    ai_status_command()
+    ai_status_command.callback()
 
 
 @click.command()
@@ -115,6 +118,7 @@ def ai_status():
 @click.option('--verbose', '-v', is_flag=True, help='Show detailed suggestions')
 def smart_suggest(question, file, verbose):
     """Get intelligent test suggestions based on code analysis and NLP."""
+    from .ai_enhanced_assistant import EnhancedAIAssistant
     try:
         assistant = EnhancedAIAssistant()
         init_result = assistant.initialize()
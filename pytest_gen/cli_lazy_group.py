@@ -0,0 +1,38 @@
+"""
+Click group that imports subcommands only when they are used.
+"""
+
+import importlib
+from typing import Dict, List, Optional
+
+import click
+
+
+class LazyGroup(click.Group):
+    """Click group resolving subcommands from "module.attribute" paths on demand."""
+    
+    def __init__(self, *args, lazy_subcommands: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Maps command name -> "package.module.command_object"
+        self.lazy_subcommands = lazy_subcommands or {}
+    
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        """List eager and lazy subcommands together."""
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+    
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        """Return a subcommand, importing its module on first use."""
+        if cmd_name in self.lazy_subcommands:
+            return self._lazy_load(cmd_name)
+        return super().get_command(ctx, cmd_name)
+    
+    def _lazy_load(self, cmd_name: str) -> click.Command:
+        """Import and cache a lazily registered subcommand."""
+        module_name, attr_name = self.lazy_subcommands[cmd_name].rsplit(".", 1)
+        command = getattr(importlib.import_module(module_name), attr_name)
+        if not isinstance(command, click.Command):
+            raise ValueError(f"Lazy loading of {cmd_name} failed: {attr_name} is not a click command")
+        # Register eagerly from now on so later lookups skip the import machinery
+        self.add_command(command, cmd_name)
+        del self.lazy_subcommands[cmd_name]
+        return command
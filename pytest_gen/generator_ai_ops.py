@@ -3,7 +3,6 @@ AI assistant integration for generator operations.
 """
 
 from typing import List, Dict, Any, Optional
-from .ai_assistant import AIAssistant
 
 
 class GeneratorAIOperations:
@@ -17,6 +16,7 @@ class GeneratorAIOperations:
     def _initialize_ai_assistant(self):
         """Initialize AI assistant for recommendations."""
         try:
+            from .ai_assistant import AIAssistant
             self.ai_assistant = AIAssistant()
             init_result = self.ai_assistant.initialize()
             if not init_result["success"]:
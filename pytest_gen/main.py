@@ -4,14 +4,26 @@ CLI interface for pytest code generator.
 
 import click
 from .cli_core_commands import generate, analyze, init_config, info
-from .cli_ai_commands import ask, explain, suggest, review, assistant, ai_status, smart_suggest
 from .cli_gui_commands import gui, web_gui
 from .cli_dashboard_commands import dashboard
 from .library_commands import library
 from .automation_commands import automation
+from .cli_lazy_group import LazyGroup
 
 
-@click.group()
+# AI Assistant Commands, imported only when invoked
+AI_COMMANDS = {
+    "ask": "pytest_gen.cli_ai_commands.ask",
+    "explain": "pytest_gen.cli_ai_commands.explain",
+    "suggest": "pytest_gen.cli_ai_commands.suggest",
+    "review": "pytest_gen.cli_ai_commands.review",
+    "assistant": "pytest_gen.cli_ai_commands.assistant",
+    "ai-status": "pytest_gen.cli_ai_commands.ai_status",
+    "smart-suggest": "pytest_gen.cli_ai_commands.smart_suggest",
+}
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=dict(AI_COMMANDS))
 @click.version_option(version="1.0.0")
 def cli():
     """Pytest Code Generator - Generate comprehensive test cases from Python code."""
@@ -24,15 +36,6 @@ cli.add_command(analyze)
 cli.add_command(init_config)
 cli.add_command(info)
 
-# AI Assistant Commands
-cli.add_command(ask)
-cli.add_command(explain)
-cli.add_command(suggest)
-cli.add_command(review)
-cli.add_command(assistant)
-cli.add_command(ai_status)
-cli.add_command(smart_suggest)
-
 # GUI Commands
 cli.add_command(gui)
 cli.add_command(web_gui)